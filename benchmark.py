@@ -0,0 +1,252 @@
+# benchmarks for color_functions
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# usage: python benchmark.py [--quick] [--filter TEXT] [-o results.json]
+#                            [--baseline baseline.json] [--threshold 1.2]
+#
+# times single calls and batches of several input and palette sizes with
+# seeded inputs, prints a table and writes the results as JSON. with a
+# baseline the same cases are compared and the exit status is 1 when any
+# case is slower than threshold times its baseline.
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import timeit
+
+import numpy as np
+
+import color_functions as cf
+import check_import_time
+
+SEED = 20240101
+
+
+def _hexes(n, seed=SEED):
+    rng = np.random.default_rng(seed)
+    return cf.rgb2hex_array(rng.integers(0, 256, (n, 3), dtype=np.uint8))
+
+
+def _palette(size, seed=SEED):
+    # the bundled palette, or a seeded random catalog of the given size
+    if size is None:
+        return cf.load_palette()
+    rng = np.random.default_rng(seed + size)
+    values = rng.choice(1 << 24, size, replace=False)
+    colors = cf.rgb2hex_array(np.stack([values >> 16, (values >> 8) & 0xff, values & 0xff], axis=1))
+    return {c: 'color %d' % i for i, c in enumerate(colors)}
+
+
+def _load_palette(compiled):
+    # a copy of the bundled csv, so a colors.bin next to it does not decide
+    # which path is timed. the directory lives as long as the timed function
+    directory = tempfile.TemporaryDirectory()
+    path = os.path.join(directory.name, 'colors.csv')
+    shutil.copyfile(cf.palette_path, path)
+    if compiled:
+        cf.compile_palette(path)
+    return lambda directory=directory: cf.load_palette(path)
+
+
+def _cases(quick):
+    """
+    Yields (name, kind, size, palette size, setup) where setup returns the function to time.
+    kind is 'call' for single call latency and 'batch' for throughput over size inputs.
+    """
+    sizes = (1000, 10000) if quick else (1000, 10000, 100000)
+    palettes = (None, 5000) if quick else (None, 5000, 30000)
+    one = _hexes(1)[0]
+    bundled = len(cf.load_palette())
+
+    yield 'hex2rgb', 'call', 1, None, lambda: lambda: cf.hex2rgb(one)
+    yield 'rgb2hex', 'call', 1, None, lambda: lambda: cf.rgb2hex((18, 52, 86))
+    yield 'similarity', 'call', 1, None, lambda: lambda: cf.similarity(one, '#b0bf1a')
+    for name in ('complimentary', 'splitComplimentary', 'triadic', 'tetradic'):
+        yield name, 'call', 1, None, lambda f=getattr(cf, name): lambda: f(one)
+    yield 'analogous', 'call', 1, None, lambda: lambda: cf.analogous(one, 30)
+    for palette in palettes:
+        yield 'getColorName', 'call', 1, palette, lambda: lambda: cf.getColorName(one)
+    yield 'load_palette csv', 'call', 1, None, lambda: _load_palette(False)
+    yield 'load_palette compiled', 'call', 1, None, lambda: _load_palette(True)
+
+    for size in sizes:
+        def decode(size=size):
+            hexes = _hexes(size)
+            return lambda: cf.hex2rgb_array(hexes)
+
+        def encode(size=size):
+            rgb = cf.hex2rgb_array(_hexes(size))
+            return lambda: cf.rgb2hex_array(rgb)
+
+        def triadic(size=size):
+            rgb = cf.hex2rgb_array(_hexes(size))
+            return lambda: cf.harmonies(rgb, 'triadic')
+
+        yield 'hex2rgb_array', 'batch', size, None, decode
+        yield 'rgb2hex_array', 'batch', size, None, encode
+        yield 'harmonies triadic', 'batch', size, None, triadic
+        for palette in palettes:
+            # keep palette times input under 30 million scores per case
+            if (palette or bundled) * size > 3e7:
+                continue
+
+            def names(size=size):
+                rgb = cf.hex2rgb_array(_hexes(size))
+                return lambda: cf.get_color_names(rgb)
+
+            yield 'get_color_names', 'batch', size, palette, names
+
+
+def _time(f, kind, repeat):
+    f()
+    if kind == 'call':
+        timer = timeit.Timer(f)
+        number = timer.autorange()[0]
+        times = [t / number for t in timer.repeat(repeat, number)]
+    else:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            f()
+            times.append(time.perf_counter() - start)
+    return sorted(times)
+
+
+def run(quick=False, only=None, repeat=5):
+    """
+    Runs the benchmarks and returns dict of environment and results.
+    """
+    results = []
+    current = None
+    try:
+        for name, kind, size, palette, setup in _cases(quick):
+            if only and only not in name:
+                continue
+            if palette != current:
+                cf.set_palette(_palette(palette))
+                current = palette
+            times = _time(setup(), kind, repeat)
+            median = times[len(times) // 2]
+            results.append({
+                'name': name,
+                'kind': kind,
+                'size': size,
+                'palette': palette or len(cf.color_names),
+                'seconds': median,
+                'min_seconds': times[0],
+                'items_per_second': size / median if median else None,
+            })
+    finally:
+        cf.set_palette(_palette(None))
+    if not only or only in 'import color_functions':
+        ms = check_import_time.import_time(runs=repeat)
+        results.append({'name': 'import color_functions', 'kind': 'import', 'size': 1, 'palette': None,
+                        'seconds': ms / 1000.0, 'min_seconds': ms / 1000.0, 'items_per_second': None})
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'machine': platform.machine(),
+            'seed': SEED,
+            'repeat': repeat,
+            'quick': quick,
+        },
+        'results': results,
+    }
+
+
+def _key(result):
+    return result['name'], result['kind'], result['size'], result['palette']
+
+
+def compare(report, baseline, threshold):
+    """
+    Adds ratio to baseline to each result and returns list of results slower than threshold.
+    """
+    before = {_key(result): result for result in baseline['results']}
+    slower = []
+    for result in report['results']:
+        old = before.get(_key(result))
+        if old is None or not old['seconds']:
+            continue
+        result['baseline_seconds'] = old['seconds']
+        result['ratio'] = result['seconds'] / old['seconds']
+        if result['ratio'] > threshold:
+            slower.append(result)
+    return slower
+
+
+def _format(result):
+    if result['kind'] == 'batch':
+        speed = '%12.0f items/s' % result['items_per_second']
+    elif result['kind'] == 'import':
+        speed = '%12.2f ms' % (result['seconds'] * 1e3)
+    else:
+        speed = '%12.2f us/call' % (result['seconds'] * 1e6)
+    line = '%-24s %-6s %7d %7s %s' % (result['name'], result['kind'], result['size'],
+                                      result['palette'] or '-', speed)
+    if 'ratio' in result:
+        line += '  %5.2fx baseline' % result['ratio']
+    return line
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark color_functions.')
+    parser.add_argument('--quick', action='store_true', help='smaller input and palette sizes')
+    parser.add_argument('--filter', help='only run benchmarks whose name contains this')
+    parser.add_argument('--repeat', type=int, default=5, help='timings per case, the median is kept')
+    parser.add_argument('-o', '--output', help='write results as JSON to this file')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--threshold', type=float, default=1.2,
+                        help='slowdown ratio to the baseline counted as a regression')
+    args = parser.parse_args(argv)
+
+    report = run(args.quick, args.filter, args.repeat)
+    slower = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = compare(report, json.load(f), args.threshold)
+    for result in report['results']:
+        print(_format(result))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    if slower:
+        print('%d regressions over %.2fx baseline:' % (len(slower), args.threshold), file=sys.stderr)
+        for result in slower:
+            print('  ' + _format(result), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,81 @@
+# import time budget for color_functions
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# usage: python check_import_time.py [--budget MS] [--runs N]
+# exits with status 1 when `import color_functions` takes longer than the
+# budget or pulls in numpy or the palette
+
+import argparse
+import os
+import py_compile
+import subprocess
+import sys
+
+# milliseconds for `import color_functions` including its own imports,
+# measured from compiled bytecode with the best of several runs
+IMPORT_BUDGET_MS = 15.0
+
+_probe = ('import sys, color_functions; '
+          'print("numpy" in sys.modules, "color_names" in vars(color_functions))')
+
+
+def import_time(module='color_functions', runs=5):
+    """
+    Returns best cumulative import time of module in milliseconds over fresh interpreters.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    py_compile.compile(os.path.join(here, module + '.py'), doraise=True)
+    env = dict(os.environ)
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    best = None
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+                                cwd=here, env=env, capture_output=True, text=True, check=True)
+        for line in result.stderr.splitlines():
+            fields = line.split('|')
+            if len(fields) == 3 and fields[2].strip() == module:
+                us = int(fields[1])
+                best = us if best is None else min(best, us)
+    return best / 1000.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check the import time budget of color_functions.')
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_MS, help='budget in milliseconds')
+    parser.add_argument('--runs', type=int, default=5, help='number of fresh interpreters to time')
+    args = parser.parse_args(argv)
+    ms = import_time(runs=args.runs)
+    here = os.path.dirname(os.path.abspath(__file__))
+    loaded = subprocess.run([sys.executable, '-c', _probe], cwd=here, capture_output=True,
+                            text=True, check=True).stdout.split()
+    ok = ms <= args.budget and loaded == ['False', 'False']
+    print('import color_functions: %.1f ms (budget %.1f ms), numpy loaded: %s, palette loaded: %s'
+          % (ms, args.budget, loaded[0], loaded[1]))
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
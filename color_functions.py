@@ -25,13 +25,103 @@
 # SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 
 import colorsys
-import numpy as np
+
+
+class _LazyModule:
+    # numpy is only needed by the batch functions, so it is imported on first
+    # use and the module global is replaced with the real module
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attr):
+        import importlib
+        module = importlib.import_module(self._name)
+        globals()['np'] = module
+        return getattr(module, attr)
+
+
+np = _LazyModule('numpy')
+
+
+# instrumentation
+# opt-in counters for production. the public lookup, codec and harmony
+# functions record calls and cumulative time while instrumentation is
+# enabled. each cache counts its hits and misses where it is loaded: the
+# palette when it has to be read from disk, the palette matrix when it has
+# to be computed and the lookup table file when it has to be built. when
+# disabled each of them only checks that _stats is None.
+
+import functools
+import time
+
+_stats = None
+
+
+def _count(cache, outcome, n=1):
+    if _stats is not None:
+        _stats['cache'][cache][outcome] += n
+
+
+def _instrument(f):
+    name = f.__name__
+
+    @functools.wraps(f)
+    def wrapper(*args, **kwargs):
+        if _stats is None:
+            return f(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return f(*args, **kwargs)
+        finally:
+            if _stats is not None:
+                record = _stats['calls'].setdefault(name, {'calls': 0, 'seconds': 0.0})
+                record['calls'] += 1
+                record['seconds'] += time.perf_counter() - start
+    return wrapper
+
+
+def reset_instrumentation():
+    """
+    Clears recorded counts and times.
+    """
+    global _stats
+    if _stats is not None:
+        _stats = {'calls': {},
+                  'cache': {cache: {'hits': 0, 'misses': 0} for cache in ('palette', 'palette_matrix', 'lookup_table')}}
+
+
+def enable_instrumentation(enabled=True):
+    """
+    Turns recording of call counts, cumulative time and cache hits on or off.
+    """
+    global _stats
+    if enabled and _stats is None:
+        _stats = {}
+        reset_instrumentation()
+    elif not enabled:
+        _stats = None
+
+
+def instrumentation_stats():
+    """
+    Returns dict of recorded calls with cumulative seconds, and cache hits, misses and hit rate.
+    The lookup table is counted each time it is turned on, a miss when its file has to be built.
+    """
+    if _stats is None:
+        return None
+    calls = {name: dict(record) for name, record in _stats['calls'].items()}
+    cache = {}
+    for name, record in _stats['cache'].items():
+        total = record['hits'] + record['misses']
+        cache[name] = dict(record, hit_rate=record['hits'] / total if total else None)
+    return {'calls': calls, 'cache': cache}
 
 # convert list to tuple
 def convert(list):
     return tuple(list)
 
 
+@_instrument
 def rgb2hex(val):
     """
     Takes tuple and converts to hex value.
@@ -40,15 +130,115 @@ def rgb2hex(val):
     return conversion
 
 
+@_instrument
 def hex2rgb(val):
     """
     Takes hex string and converts to rgb tuple.
     """
     hexNum = val.strip('#')
     hexLen = len(hexNum)
+    if hexLen in (3, 4):
+        # shorthand digits stand for doubled digits, #f80 is #ff8800
+        hexNum = ''.join(x * 2 for x in hexNum)
+        hexLen *= 2
     conversion = tuple(int(hexNum[i:i+hexLen//3], 16) for i in range(0, hexLen, hexLen//3))
     return conversion
 
+# bulk conversion
+# hex strings are decoded as one byte buffer. each character is mapped to
+# its nibble through a table and each row is gathered by offset, so no
+# tuple or int() call is made per color.
+
+_hex_digits = b'0123456789abcdef'
+
+
+def _nibbles():
+    table = np.full(256, 0xff, dtype=np.uint8)
+    table[np.frombuffer(b'0123456789', np.uint8)] = np.arange(10)
+    table[np.frombuffer(b'abcdef', np.uint8)] = np.arange(10, 16)
+    table[np.frombuffer(b'ABCDEF', np.uint8)] = np.arange(10, 16)
+    return table
+
+
+@_instrument
+def hex2rgb_array(values, alpha=False, errors='raise'):
+    """
+    Takes sequence of hex strings or newline separated bytes and converts to (n, 3) uint8 array.
+    Accepts 3, 4, 6 and 8 digit forms with optional '#'. With alpha the array is (n, 4) and
+    colors without alpha get 255. Invalid rows raise ValueError, or with errors='mask' are
+    left as zeros and returned as array of row indices: (array, invalid).
+    """
+    if errors not in ('raise', 'mask'):
+        raise ValueError("errors must be 'raise' or 'mask'")
+    if isinstance(values, (bytes, bytearray, memoryview)):
+        buf = bytes(values)
+        if buf.endswith(b'\n'):
+            buf = buf[:-1]
+        empty = not buf
+    else:
+        # a line break inside a string would split it into two rows, so such
+        # strings are decoded as empty rows and reported invalid at their index
+        values = ['' if '\n' in v or '\r' in v else v for v in values]
+        buf = '\n'.join(values).encode('ascii', errors='replace')
+        empty = not values
+    channels = 4 if alpha else 3
+    if empty:
+        rgb = np.zeros((0, channels), dtype=np.uint8)
+        return (rgb, np.zeros(0, dtype=np.intp)) if errors == 'mask' else rgb
+    data = np.frombuffer(buf, dtype=np.uint8)
+    breaks = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate([[0], breaks + 1])
+    ends = np.concatenate([breaks, [len(data)]])
+    # allow crlf line endings and a leading '#'
+    padded = np.concatenate([data, [0]])
+    ends = ends - ((ends > starts) & (padded[ends - 1] == ord('\r')))
+    starts = starts + ((ends > starts) & (padded[starts] == ord('#')))
+    length = ends - starts
+    nibble = _nibbles()[padded]
+    bad = np.concatenate([[0], np.cumsum(nibble > 15)])
+    valid = np.isin(length, (3, 4, 6, 8)) & (bad[ends] == bad[starts])
+    short = length < 6
+    rgb = np.empty((len(starts), channels), dtype=np.uint8)
+    for j in range(channels):
+        hi = np.where(short, starts + j, starts + 2 * j)
+        lo = np.where(short, hi, hi + 1)
+        value = nibble[np.minimum(hi, len(data))].astype(np.uint16) * 16 + nibble[np.minimum(lo, len(data))]
+        rgb[:, j] = np.where(valid, value, 0)
+    if alpha:
+        rgb[valid & ((length == 3) | (length == 6)), 3] = 255
+    invalid = np.flatnonzero(~valid)
+    if errors == 'mask':
+        return rgb, invalid
+    if len(invalid):
+        rows = ', '.join(str(i) for i in invalid[:10])
+        raise ValueError('invalid hex color in %d rows: %s%s' % (len(invalid), rows, ', ...' if len(invalid) > 10 else ''))
+    return rgb
+
+
+@_instrument
+def rgb2hex_array(rgb, as_bytes=False):
+    """
+    Takes (n, 3) or (n, 4) uint8 array and converts to list of hex strings,
+    or to newline terminated bytes with as_bytes.
+    """
+    rgb = np.asarray(rgb, dtype=np.uint8)
+    if rgb.size == 0:
+        return b'' if as_bytes else []
+    if rgb.ndim != 2 or rgb.shape[1] not in (3, 4):
+        raise ValueError('expected (n, 3) or (n, 4) array, got shape %s' % (rgb.shape,))
+    digits = np.frombuffer(_hex_digits, dtype=np.uint8)
+    width = 1 + 2 * rgb.shape[1]
+    out = np.empty((len(rgb), width + 1), dtype=np.uint8)
+    out[:, 0] = ord('#')
+    out[:, 1:width:2] = digits[rgb >> 4]
+    out[:, 2:width:2] = digits[rgb & 0xf]
+    out[:, width] = ord('\n')
+    if as_bytes:
+        return out.tobytes()
+    return np.ascontiguousarray(out[:, :width]).view('S%d' % width).ravel().astype('U%d' % width).tolist()
+
+
+@_instrument
 def complimentary(hexval):
     """
     Takes hex value converts to rgb tuple and produces complimentary color.
@@ -66,6 +256,7 @@ def complimentary(hexval):
 # split complementary color
 # A split-complementary color scheme is a three-color combination that consists of a base color and two colors that are 150  degrees and 210 degrees apart from the base color respectively
 
+@_instrument
 def splitComplimentary(hexval):
     """
     Takes hex value converts to rgb tuple and produces list of split complimentary colors.
@@ -87,6 +278,7 @@ def splitComplimentary(hexval):
 # Analogous Color
 # Analogous color schemes are created by pairing one main color with the two colors directly next to it on the color wheel. We can specify the angle between the main color and the other two colors
 
+@_instrument
 def analogous(hexval, d):
     """
     Takes hex value and angle (out of 100) converts to rgb tuple and produces list of analogous colors)
@@ -108,6 +300,7 @@ def analogous(hexval, d):
 
 # Triadic Color
 # Triadic colors are a combination of three colors that consists of a main color and two colors that are 120 degrees and 240 degrees apart from the main color respectively
+@_instrument
 def triadic(hexval):
     """
     Takes hex value converts to rgb tuple and produces list of triadic colors.
@@ -127,6 +320,7 @@ def triadic(hexval):
 
 # Tetradic Color
 # Tetradic colors are four-color combination that consists of a main color and three colors that are 90 degrees, 180 degrees, and 270 degrees apart from the main color respectively
+@_instrument
 def tetradic(hexval):
     """
     Takes hex value converts to rgb tuple and produces list of tetradic colors.
@@ -147,6 +341,89 @@ def tetradic(hexval):
     return [color_60_rgb, color_180_rgb, color_240_rgb]
 
 
+# batch harmonies
+# hls conversion over arrays with the same arithmetic as colorsys, so hue
+# rotation of n colors in one pass rounds to the same values as the scalar
+# functions above.
+
+def rgb2hls_array(rgb):
+    """
+    Takes (n, 3) uint8 array and converts to (n, 3) float array of hue, lightness and saturation.
+    """
+    c = np.asarray(rgb, dtype=np.uint8).reshape(-1, 3) / 255.0
+    r, g, b = c[:, 0], c[:, 1], c[:, 2]
+    maxc = c.max(axis=1)
+    minc = c.min(axis=1)
+    sumc = maxc + minc
+    rangec = maxc - minc
+    l = sumc / 2.0
+    gray = minc == maxc
+    with np.errstate(divide='ignore', invalid='ignore'):
+        s = np.where(l <= 0.5, rangec / sumc, rangec / (2.0 - maxc - minc))
+        rc = (maxc - r) / rangec
+        gc = (maxc - g) / rangec
+        bc = (maxc - b) / rangec
+    h = np.where(r == maxc, bc - gc, np.where(g == maxc, 2.0 + rc - bc, 4.0 + gc - rc))
+    h = (h / 6.0) % 1.0
+    return np.stack([np.where(gray, 0.0, h), l, np.where(gray, 0.0, s)], axis=1)
+
+
+def _hue_channel(m1, m2, hue):
+    hue = hue % 1.0
+    return np.where(hue < colorsys.ONE_SIXTH, m1 + (m2 - m1) * hue * 6.0,
+                    np.where(hue < 0.5, m2,
+                             np.where(hue < colorsys.TWO_THIRD,
+                                      m1 + (m2 - m1) * (colorsys.TWO_THIRD - hue) * 6.0, m1)))
+
+
+def hls2rgb_array(hls):
+    """
+    Takes (..., 3) float array of hue, lightness and saturation and converts to rgb floats between 0 and 1.
+    """
+    hls = np.asarray(hls, dtype=np.float64)
+    h, l, s = hls[..., 0], hls[..., 1], hls[..., 2]
+    m2 = np.where(l <= 0.5, l * (1.0 + s), l + s - (l * s))
+    m1 = 2.0 * l - m2
+    rgb = np.stack([_hue_channel(m1, m2, h + colorsys.ONE_THIRD),
+                    _hue_channel(m1, m2, h),
+                    _hue_channel(m1, m2, h - colorsys.ONE_THIRD)], axis=-1)
+    return np.where((s == 0.0)[..., None], l[..., None], rgb)
+
+
+# hue rotations in degrees for each scheme, and whether the rotated hue is
+# wrapped before conversion as analogous() does
+_schemes = {
+    'complimentary': ((180.0,), False),
+    'splitComplimentary': ((150.0, 210.0), False),
+    'analogous': ((-30.0, 30.0), True),
+    'triadic': ((120.0, 240.0), False),
+    'tetradic': ((60.0, 180.0, 240.0), False),
+}
+
+
+@_instrument
+def harmonies(colors, scheme, angles=None):
+    """
+    Takes list of hex strings or (n, 3) rgb array and produces (n, k, 3) uint8 array of the
+    scheme's colors. angles overrides the hue rotations in degrees; for analogous a single
+    angle d gives rotations of -d and d.
+    """
+    if scheme not in _schemes:
+        raise ValueError('unknown scheme %r, expected one of %s' % (scheme, ', '.join(_schemes)))
+    offsets, wrap = _schemes[scheme]
+    if angles is not None:
+        if np.ndim(angles) == 0:
+            angles = (-angles, angles) if scheme == 'analogous' else (angles,)
+        offsets = angles
+    hls = rgb2hls_array(_as_rgb(colors))
+    hue = hls[:, 0, None] + np.array([d / 360.0 for d in offsets])
+    if wrap:
+        hue = hue % 1.0
+    rotated = np.broadcast_to(hls[:, None, :], hue.shape + (3,)).copy()
+    rotated[..., 0] = hue
+    return np.rint(hls2rgb_array(rotated) * 255).astype(np.uint8)
+
+
 # identification of color names
 import re
 re_color = re.compile('#([0-9a-f]{2})([0-9a-f]{2})([0-9a-f]{2})')
@@ -155,6 +432,7 @@ from math import sqrt
 def color_to_rgb(color):
     return tuple(int(x, 16) / 255.0 for x in re_color.match(color).groups())
 
+@_instrument
 def similarity(color1, color2):
     """Computes the pearson correlation coefficient for two colors. The result
     will be between 1.0 (very similar) and -1.0 (no similarity)."""
@@ -175,9 +453,374 @@ def similarity(color1, color2):
     return computed
 
 
-color_names = {'#b0bf1a': 'acid green', '#c9ffe5': 'aero blue', '#b284be': 'african violet', '#edeae0': 'alabaster', '#f0f8ff': 'alice blue', '#c46210': 'alloy orange', '#efdecd': 'almond', '#e52b50': 'amaranth', '#f19cbb': 'amaranth pink', '#ab274f': 'amaranth purple', '#d3212d': 'amaranth red', '#3b7a57': 'amazon', '#ffbf00': 'amber', '#9966cc': 'amethyst', '#a4c639': 'android green', '#cd9575': 'antique brass', '#665d1e': 'antique bronze', '#915c83': 'antique fuchsia', '#841b2d': 'antique ruby', '#faebd7': 'antique white', '#8db600': 'apple green', '#fbceb1': 'apricot', '#7fffd4': 'aquamarine', '#d0ff14': 'arctic lime', '#4b5320': 'army green', '#8f9779': 'artichoke', '#b2beb5': 'ash gray', '#87a96b': 'asparagus', '#ff9966': 'atomic tangerine', '#a52a2a': 'auburn', '#fdee00': 'aureolin', '#007fff': 'azure', '#89cff0': 'baby blue', '#a1caf1': 'baby blue eyes', '#fefefa': 'baby powder', '#fae7b5': 'banana mania', '#da1884': 'barbie pink', '#7c0a02': 'barn red', '#9f8170': 'beaver', '#f5f5dc': 'beige', '#ffe4c4': 'bisque', '#3d2b1f': 'bistre', '#cae00d': 'bitter lemon', '#fe6f5e': 'bittersweet', '#000000': 'black', '#3d0c02': 'black bean', '#1b1811': 'black chocolate', '#3b2f2f': 'black coffee', '#54626f': 'black coral', '#3b3c36': 'black olive', '#bfafb2': 'black shadows', '#ffebcd': 'blanched almond', '#318ce7': 'bleu de france', '#ace5ee': 'blizzard blue', '#faf0be': 'blond', '#660000': 'blood red', '#0000ff': 'blue', '#a2a2d0': 'blue bell', '#5dadec': 'blue jeans', '#126180': 'blue sapphire', '#5072a7': 'blue yonder', '#0d98ba': 'blue-green', '#8a2be2': 'blue-violet', '#3c69e7': 'bluetiful', '#de5d83': 'blush', '#79443b': 'bole', '#e3dac9': 'bone', '#006a4e': 'bottle green', '#87413f': 'brandy', '#cb4154': 'brick red', '#66ff00': 'bright green', '#d891ef': 'bright lilac', '#ff55a3': 'brilliant rose', '#fb607f': 'brink pink', '#004225': 'british racing green', '#cd7f32': 'bronze', '#88540b': 'brown', '#af6e4d': 'brown sugar', '#7bb661': 'bud green', '#f0dc82': 'buff', '#deb887': 'burlywood', '#a17a74': 'burnished brown', '#cc5500': 'burnt orange', '#e97451': 'burnt sienna', '#8a3324': 'burnt umber', '#bd33a4': 'byzantine', '#536872': 'cadet', '#5f9ea0': 'cadet blue', '#91a3b0': 'cadet grey', '#006b3c': 'cadmium green', '#ed872d': 'cadmium orange', '#e30022': 'cadmium red', '#fff600': 'cadmium yellow', '#a3c1ad': 'cambridge blue', '#efbbcc': 'cameo pink', '#ffff99': 'canary', '#ff0800': 'candy apple red', '#592720': 'caput mortuum', '#c41e3a': 'cardinal', '#00cc99': 'caribbean green', '#960018': 'carmine', '#ffa6c9': 'carnation pink', '#b31b1b': 'carnelian', '#56a0d3': 'carolina blue', '#ed9121': 'carrot orange', '#00563f': 'castleton green', '#c95a49': 'cedar chest', '#ace1af': 'celadon', '#2f847c': 'celadon green', '#246bce': 'celtic blue', '#de3163': 'cerise', '#007ba7': 'cerulean', '#2a52be': 'cerulean blue', '#6d9bc3': 'cerulean frost', '#f7e7ce': 'champagne', '#f1ddcf': 'champagne pink', '#36454f': 'charcoal', '#232b2b': 'charleston green', '#e68fac': 'charm pink', '#ffb7c5': 'cherry blossom pink', '#954535': 'chestnut', '#a8516e': 'china rose', '#aa381e': 'chinese red', '#856088': 'chinese violet', '#ffb200': 'chinese yellow', '#ffa700': 'chrome yellow', '#98817b': 'cinereous', '#cd607e': 'cinnamon satin', '#9fa91f': 'citron', '#7f1734': 'claret', '#0047ab': 'cobalt blue', '#d2691e': 'cocoa brown', '#b9d9eb': 'columbia blue', '#8c92ac': 'cool grey', '#b87333': 'copper', '#ad6f69': 'copper penny', '#cb6d51': 'copper red', '#996666': 'copper rose', '#ff3800': 'coquelicot', '#ff7f50': 'coral', '#893f45': 'cordovan', '#6495ed': 'cornflower blue', '#fff8dc': 'cornsilk', '#2e2d88': 'cosmic cobalt', '#fff8e7': 'cosmic latte', '#ffbcd9': 'cotton candy', '#81613c': 'coyote brown', '#fffdd0': 'cream', '#dc143c': 'crimson', '#f5f5f5': 'cultured', '#00b7eb': 'cyan (process)', '#58427c': 'cyber grape', '#f56fa1': 'cyclamen', '#654321': 'dark brown', '#5d3954': 'dark byzantium', '#26428b': 'dark cornflower blue', '#008b8b': 'dark cyan', '#b8860b': 'dark goldenrod', '#013220': 'dark green', '#1a2421': 'dark jungle green', '#bdb76b': 'dark khaki', '#534b4f': 'dark liver', '#8b008b': 'dark magenta', '#4a5d23': 'dark moss green', '#556b2f': 'dark olive green', '#ff8c00': 'dark orange', '#9932cc': 'dark orchid', '#03c03c': 'dark pastel green', '#301934': 'dark purple', '#8b0000': 'dark red', '#e9967a': 'dark salmon', '#8fbc8f': 'dark sea green', '#3c1414': 'dark sienna', '#8cbed6': 'dark sky blue', '#483d8b': 'dark slate blue', '#2f4f4f': 'dark slate gray', '#177245': 'dark spring green', '#00ced1': 'dark turquoise', '#9400d3': 'dark violet', '#00703c': 'dartmouth green', '#da3287': 'deep cerise', '#b94e48': 'deep chestnut', '#004b49': 'deep jungle green', '#ff1493': 'deep pink', '#ff9933': 'deep saffron', '#00bfff': 'deep sky blue', '#4a646c': 'deep space sparkle', '#7e5e60': 'deep taupe', '#2243b6': 'denim blue', '#edc9af': 'desert sand', '#696969': 'dim gray', '#1e90ff': 'dodger blue', '#d71868': 'dogwood rose', '#00009c': 'duke blue', '#efdfbb': 'dutch white', '#e1a95f': 'earth yellow', '#555d50': 'ebony', '#1b1b1b': 'eerie black', '#614051': 'eggplant', '#f0ead6': 'eggshell', '#1034a6': 'egyptian blue', '#7df9ff': 'electric blue', '#6f00ff': 'electric indigo', '#ccff00': 'electric lime', '#bf00ff': 'electric purple', '#6c3082': 'eminence', '#1b4d3e': 'english green', '#b48395': 'english lavender', '#ab4b52': 'english red', '#cc474b': 'english vermillion', '#563c5c': 'english violet', '#00ff40': 'erin', '#96c8a2': 'eton blue', '#801818': 'falu red', '#b53389': 'fandango', '#de5285': 'fandango pink', '#e5aa70': 'fawn', '#4d5d53': 'feldgrau', '#4f7942': 'fern green', '#6c541e': 'field drab', '#ff5470': 'fiery rose', '#ce2029': 'fire engine red', '#e95c4b': 'fire opal', '#b22222': 'firebrick', '#e25822': 'flame', '#eedc82': 'flax', '#0063dc': 'flickr blue', '#fb0081': 'flickr pink', '#a2006d': 'flirt', '#fffaf0': 'floral white', '#15f4ee': 'fluorescent blue', '#856d4d': 'french bistre', '#0072bb': 'french blue', '#fd3f92': 'french fuchsia', '#9efd38': 'french lime', '#d473d4': 'french mauve', '#fd6c9e': 'french pink', '#c72c48': 'french raspberry', '#f64a8a': 'french rose', '#77b5fe': 'french sky blue', '#8806ce': 'french violet', '#cc397b': 'fuchsia purple', '#c74375': 'fuchsia rose', '#e48400': 'fulvous', '#dcdcdc': 'gainsboro', '#e49b0f': 'gamboge', '#007f66': 'generic viridian', '#f8f8ff': 'ghost white', '#6082b6': 'glaucous', '#ab92b3': 'glossy grape', '#a57c00': 'gold', '#85754e': 'gold fusion', '#996515': 'golden brown', '#fcc200': 'golden poppy', '#ffdf00': 'golden yellow', '#daa520': 'goldenrod', '#676767': 'granite gray', '#a7f432': 'green lizard', '#6eaea1': 'green sheen', '#1164b4': 'green-blue', '#009966': 'green-cyan', '#adff2f': 'green-yellow', '#a99a86': 'grullo', '#2a3439': 'gunmetal', '#e9d66b': 'hansa yellow', '#3fff00': 'harlequin', '#da9100': 'harvest gold', '#ff7a00': 'heat wave', '#df73ff': 'heliotrope', '#f0fff0': 'honeydew', '#006db0': 'honolulu blue', '#ff1dce': 'hot magenta', '#ff69b4': 'hot pink', '#355e3b': 'hunter green', '#138808': 'india green', '#cd5c5c': 'indian red', '#e3a857': 'indian yellow', '#4b0082': 'indigo', '#00416a': 'indigo dye', '#5a4fcf': 'iris', '#f4f0ec': 'isabelline', '#b2ffff': 'italian sky blue', '#fffff0': 'ivory', '#00a86b': 'jade', '#a50b5e': 'jazzberry jam', '#f4ca16': 'jonquil', '#bdda57': 'june bud', '#29ab87': 'jungle green', '#4cbb17': 'kelly green', '#3ab09e': 'keppel', '#e8f48c': 'key lime', '#e79fc4': 'kobi', '#354230': 'kombu green', '#512888': 'ksu purple', '#d6cadd': 'languid lavender', '#26619c': 'lapis lazuli', '#a9ba9d': 'laurel green', '#cf1020': 'lava', '#fff0f5': 'lavender blush', '#c4c3d0': 'lavender gray', '#7cfc00': 'lawn green', '#fffacd': 'lemon chiffon', '#cca01d': 'lemon curry', '#fdff00': 'lemon glacier', '#f6eabe': 'lemon meringue', '#fff44f': 'lemon yellow', '#545aa7': 'liberty', '#add8e6': 'light blue', '#f08080': 'light coral', '#93ccea': 'light cornflower blue', '#e0ffff': 'light cyan', '#c8ad7f': 'light french beige', '#fafad2': 'light goldenrod yellow', '#b0b0b0': 'light gray', '#d3d3d3': 'light gray', '#90ee90': 'light green', '#fed8b1': 'light orange', '#c5cbe1': 'light periwinkle', '#ffb6c1': 'light pink', '#ffa07a': 'light salmon', '#20b2aa': 'light sea green', '#87cefa': 'light sky blue', '#778899': 'light slate gray', '#b0c4de': 'light steel blue', '#ffffe0': 'light yellow', '#c8a2c8': 'lilac', '#32cd32': 'lime green', '#195905': 'lincoln green', '#faf0e6': 'linen', '#6ca0dc': 'little boy blue', '#674c47': 'liver', '#987456': 'liver chestnut', '#6699cc': 'livid', '#ffbd88': 'macaroni and cheese', '#cc3336': 'madder lake', '#ff00ff': 'magenta', '#9f4576': 'magenta haze', '#aaf0d1': 'magic mint', '#f8f4ff': 'magnolia', '#c04000': 'mahogany', '#fbec5d': 'maize', '#6050dc': 'majorelle blue', '#0bda51': 'malachite', '#979aaa': 'manatee', '#f37a48': 'mandarin', '#fdbe02': 'mango', '#ff8243': 'mango tango', '#74c365': 'mantis', '#880085': 'mardi gras', '#eaa221': 'marigold', '#e0b0ff': 'mauve', '#ef98aa': 'mauvelous', '#47abcc': 'maximum blue', '#30bfbf': 'maximum blue green', '#acace6': 'maximum blue purple', '#5e8c31': 'maximum green', '#d9e650': 'maximum green yellow', '#733380': 'maximum purple', '#d92121': 'maximum red', '#a63a79': 'maximum red purple', '#fafa37': 'maximum yellow', '#f2ba49': 'maximum yellow red', '#73c2fb': 'maya blue', '#66ddaa': 'medium aquamarine', '#0000cd': 'medium blue', '#e2062c': 'medium candy apple red', '#af4035': 'medium carmine', '#ba55d3': 'medium orchid', '#9370db': 'medium purple', '#3cb371': 'medium sea green', '#7b68ee': 'medium slate blue', '#00fa9a': 'medium spring green', '#48d1cc': 'medium turquoise', '#f8b878': 'mellow apricot', '#f8de7e': 'mellow yellow', '#febaad': 'melon', '#d3af37': 'metallic gold', '#0a7e8c': 'metallic seaweed', '#9c7c38': 'metallic sunburst', '#e4007c': 'mexican pink', '#7ed4e6': 'middle blue', '#8dd9cc': 'middle blue green', '#8b72be': 'middle blue purple', '#4d8c57': 'middle green', '#acbf60': 'middle green yellow', '#8b8680': 'middle grey', '#d982b5': 'middle purple', '#e58e73': 'middle red', '#a55353': 'middle red purple', '#ffeb00': 'middle yellow', '#ecb176': 'middle yellow red', '#702670': 'midnight', '#191970': 'midnight blue', '#ffc40c': 'mikado yellow', '#ffdae9': 'mimi pink', '#e3f988': 'mindaro', '#f5e050': 'minion yellow', '#3eb489': 'mint', '#f5fffa': 'mint cream', '#98ff98': 'mint green', '#bbb477': 'misty moss', '#ffe4e1': 'misty rose', '#8da399': 'morning blue', '#30ba8f': 'mountain meadow', '#997a8d': 'mountbatten pink', '#18453b': 'msu green', '#c54b8c': 'mulberry', '#ffdb58': 'mustard', '#317873': 'myrtle green', '#d65282': 'mystic', '#ad4379': 'mystic maroon', '#f6adc6': 'nadeshiko pink', '#ffdead': 'navajo white', '#000080': 'navy blue', '#4666ff': 'neon blue', '#39ff14': 'neon green', '#d7837f': 'new york pink', '#727472': 'nickel', '#4f42b5': 'ocean blue', '#48bf91': 'ocean green', '#cc7722': 'ochre', '#43302e': 'old burgundy', '#cfb53b': 'old gold', '#fdf5e6': 'old lace', '#796878': 'old lavender', '#c08081': 'old rose', '#848482': 'old silver', '#808000': 'olive', '#b5b35c': 'olive green', '#9ab973': 'olivine', '#353839': 'onyx', '#a8c3bc': 'opal', '#b784a7': 'opera mauve', '#ff7f00': 'orange', '#ff9f00': 'orange peel', '#f5bd1f': 'orange-yellow', '#da70d6': 'orchid', '#f2bdcd': 'orchid pink', '#841617': 'ou crimson red', '#2d383a': 'outer space (crayola)', '#ff6e4a': 'outrageous orange', '#800020': 'oxblood', '#002147': 'oxford blue', '#1ca9c9': 'pacific blue', '#006600': 'pakistan green', '#682860': 'palatinate purple', '#bcd4e6': 'pale aqua', '#9bc4e2': 'pale cerulean', '#fadadd': 'pale pink', '#78184a': 'pansy purple', '#ffefd5': 'papaya whip', '#e63e62': 'paradise pink', '#50c878': 'paris green', '#dea5a4': 'pastel pink', '#536878': "payne's grey", '#ffe5b4': 'peach', '#ffdab9': 'peach puff', '#d1e231': 'pear', '#b768a2': 'pearly purple', '#ccccff': 'periwinkle', '#1c39bb': 'persian blue', '#00a693': 'persian green', '#32127a': 'persian indigo', '#d99058': 'persian orange', '#f77fbe': 'persian pink', '#cc3333': 'persian red', '#fe28a2': 'persian rose', '#ec5800': 'persimmon', '#8ba8b7': 'pewter blue', '#000f89': 'phthalo blue', '#123524': 'phthalo green', '#2e2787': 'picotee blue', '#c30b4e': 'pictorial carmine', '#fddde6': 'piggy pink', '#01796f': 'pine green', '#2a2f23': 'pine tree', '#ffc0cb': 'pink', '#fc74fd': 'pink flamingo', '#ffddf4': 'pink lace', '#d8b2d1': 'pink lavender', '#f78fa7': 'pink sherbet', '#93c572': 'pistachio', '#e5e4e2': 'platinum', '#8e4585': 'plum', '#5946b2': 'plump purple', '#5da493': 'polished pine', '#86608e': 'pomp and power', '#be4f62': 'popstar', '#ff5a36': 'portland orange', '#b0e0e6': 'powder blue', '#f58025': 'princeton orange', '#701c1c': 'prune', '#003153': 'prussian blue', '#df00ff': 'psychedelic purple', '#cc8899': 'puce', '#ff7518': 'pumpkin', '#6a0dad': 'purple', '#9678b6': 'purple mountain majesty', '#4e5180': 'purple navy', '#fe4eda': 'purple pizzazz', '#9c51b6': 'purple plum', '#9a4eae': 'purpureus', '#436b95': 'queen blue', '#e8ccd7': 'queen pink', '#a6a6a6': 'quick silver', '#8e3a59': 'quinacridone magenta', '#ff355e': 'radical red', '#242124': 'raisin black', '#e30b5d': 'raspberry', '#915f6d': 'raspberry glace', '#b3446c': 'raspberry rose', '#d68a59': 'raw sienna', '#826644': 'raw umber', '#ff33cc': 'razzle dazzle rose', '#e3256b': 'razzmatazz', '#8d4e85': 'razzmic berry', '#663399': 'rebecca purple', '#ff0000': 'red', '#fd3a4a': 'red salsa', '#ff5349': 'red-orange', '#e40078': 'red-purple', '#c71585': 'red-violet', '#a45a52': 'redwood', '#002387': 'resolution blue', '#777696': 'rhythm', '#004040': 'rich black', '#444c38': 'rifle green', '#00cccc': 'robin egg blue', '#8a7f80': 'rocket metallic', '#838996': 'roman silver', '#ff007f': 'rose', '#f9429e': 'rose bonbon', '#9e5e6f': 'rose dust', '#674846': 'rose ebony', '#e32636': 'rose madder', '#ff66cc': 'rose pink', '#aa98a9': 'rose quartz', '#c21e56': 'rose red', '#905d5d': 'rose taupe', '#ab4e52': 'rose vale', '#65000b': 'rosewood', '#d40000': 'rosso corsa', '#bc8f8f': 'rosy brown', '#7851a9': 'royal purple', '#ce4676': 'ruber', '#d10056': 'rubine red', '#e0115f': 'ruby', '#a81c07': 'rufous', '#80461b': 'russet', '#679267': 'russian green', '#32174d': 'russian violet', '#b7410e': 'rust', '#da2c43': 'rusty red', '#8b4513': 'saddle brown', '#ff7800': 'safety orange', '#eed202': 'safety yellow', '#f4c430': 'saffron', '#bcb88a': 'sage', '#fa8072': 'salmon', '#ff91a4': 'salmon pink', '#c2b280': 'sand', '#967117': 'sand dune', '#f4a460': 'sandy brown', '#507d2a': 'sap green', '#0f52ba': 'sapphire', '#cba135': 'satin sheen gold', '#ff2400': 'scarlet', '#ff91af': 'schauss pink', '#ffd800': 'school bus yellow', '#2e8b57': 'sea green', '#59260b': 'seal brown', '#fff5ee': 'seashell', '#ffba00': 'selective yellow', '#704214': 'sepia', '#8a795d': 'shadow', '#778ba5': 'shadow blue', '#009e60': 'shamrock green', '#8fd400': 'sheen green', '#d98695': 'shimmering blush', '#5fa778': 'shiny shamrock', '#fc0fc0': 'shocking pink', '#882d17': 'sienna', '#c0c0c0': 'silver', '#acacac': 'silver chalice', '#c4aead': 'silver pink', '#bfc1c2': 'silver sand', '#cb410b': 'sinopia', '#ff3855': 'sizzling red', '#ffdb00': 'sizzling sunrise', '#007474': 'skobeloff', '#87ceeb': 'sky blue', '#cf71af': 'sky magenta', '#6a5acd': 'slate blue', '#708090': 'slate gray', '#299617': 'slimy green', '#c84186': 'smitten', '#100c08': 'smoky black', '#fffafa': 'snow', '#893843': 'solid pink', '#757575': 'sonic silver', '#1d2951': 'space cadet', '#807532': 'spanish bistre', '#0070b8': 'spanish blue', '#d10047': 'spanish carmine', '#989898': 'spanish gray', '#009150': 'spanish green', '#e86100': 'spanish orange', '#f7bfbe': 'spanish pink', '#e60026': 'spanish red', '#00ffff': 'spanish sky blue', '#4c2882': 'spanish violet', '#007f5c': 'spanish viridian', '#a7fc00': 'spring bud', '#87ff2a': 'spring frost', '#00ff7f': 'spring green', '#23297a': "st. patrick's blue", '#007bb8': 'star command blue', '#4682b4': 'steel blue', '#cc33cc': 'steel pink', '#5f8a8b': 'steel teal', '#fada5e': 'stil de grain yellow', '#e4d96f': 'straw', '#914e75': 'sugar plum', '#ffcc33': 'sunglow', '#e3ab57': 'sunray', '#cf6ba9': 'super pink', '#a83731': 'sweet brown', '#d2b48c': 'tan', '#f28500': 'tangerine', '#e4717a': 'tango pink', '#fb4d46': 'tart orange', '#483c32': 'taupe', '#8b8589': 'taupe gray', '#d0f0c0': 'tea green', '#f4c2c2': 'tea rose', '#f88379': 'tea rose', '#008080': 'teal', '#367588': 'teal blue', '#cf3476': 'telemagenta', '#e2725b': 'terra cotta', '#d8bfd8': 'thistle', '#de6fa1': 'thulian pink', '#fc89ac': 'tickle me pink', '#0abab5': 'tiffany blue', '#dbd7d2': 'timberwolf', '#eee600': 'titanium yellow', '#ff6347': 'tomato', '#00755e': 'tropical rain forest', '#2d68c4': 'true blue', '#1c05b3': 'trypan blue', '#3e8ede': 'tufts blue', '#deaa88': 'tumbleweed', '#40e0d0': 'turquoise', '#00ffef': 'turquoise blue', '#a0d6b4': 'turquoise green', '#8a9a5b': 'turtle green', '#fad6a5': 'tuscan', '#6f4e37': 'tuscan brown', '#7c4848': 'tuscan red', '#a67b5b': 'tuscan tan', '#c09999': 'tuscany', '#8a496b': 'twilight lavender', '#66023c': 'tyrian purple', '#ff6fff': 'ultra pink', '#3f00ff': 'ultramarine', '#4166f5': 'ultramarine blue', '#635147': 'umber', '#ffddca': 'unbleached silk', '#5b92e5': 'united nations blue', '#ffff66': 'unmellow yellow', '#014421': 'up forest green', '#7b1113': 'up maroon', '#ae2029': 'upsdell red', '#afdbf5': 'uranian blue', '#664228': 'van dyke brown', '#f3e5ab': 'vanilla', '#f38fa9': 'vanilla ice', '#c5b358': 'vegas gold', '#c80815': 'venetian red', '#43b3ae': 'verdigris', '#e34234': 'vermilion', '#d9381e': 'vermilion', '#a020f0': 'veronica', '#8f00ff': 'violet', '#324ab2': 'violet-blue', '#f75394': 'violet-red', '#40826d': 'viridian', '#009698': 'viridian green', '#9f1d35': 'vivid burgundy', '#00ccff': 'vivid sky blue', '#ffa089': 'vivid tangerine', '#9f00ff': 'vivid violet', '#ceff00': 'volt', '#004242': 'warm black', '#f5deb3': 'wheat', '#ffffff': 'white', '#a2add0': 'wild blue yonder', '#d470a2': 'wild orchid', '#ff43a4': 'wild strawberry', '#fc6c85': 'wild watermelon', '#a75502': 'windsor tan', '#722f37': 'wine', '#673147': 'wine dregs', '#ff007c': 'winter sky', '#56887d': 'wintergreen dream', '#c9a0dc': 'wisteria', '#c19a6b': 'wood brown', '#738678': 'xanadu', '#eeed09': 'xanthic', '#0c020f': 'xiketic', '#0f4d92': 'yale blue', '#ffff00': 'yellow', '#ffae42': 'yellow orange', '#fff700': 'yellow sunshine', '#9acd32': 'yellow-green', '#0014a8': 'zaffre'}
+# palette of color names
+# colors.csv is the single source of the palette. it is read on first use,
+# from a precompiled binary copy when one is present and up to date.
+
+import os
+import struct
+import sys
+
+palette_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'colors.csv')
+_palette_magic = b'CLP2'
+_palette_header = struct.Struct('<4sIQQ')
+
+
+def _compiled_path(path):
+    return os.path.splitext(path)[0] + '.bin'
+
+
+def _read_csv_palette(path):
+    import csv
+    palette = {}
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            # blank lines are skipped, other rows need a color and a name
+            if not row:
+                continue
+            if len(row) != 2:
+                raise ValueError('%s line %d: expected color,name, got %r' % (path, reader.line_num, row))
+            palette[row[0]] = row[1]
+    return palette
+
+
+def _read_compiled_palette(path, stat):
+    # layout: header, then the hex values followed by the names as one utf-8
+    # text separated by nul characters, so reading it is one decode and one
+    # split instead of a step per row
+    with open(path, 'rb') as f:
+        data = f.read()
+    magic, count, size, mtime = _palette_header.unpack_from(data)
+    if magic != _palette_magic or size != stat.st_size or mtime != stat.st_mtime_ns:
+        return None
+    fields = data[_palette_header.size:].decode('utf-8').split('\0')
+    if len(fields) != 2 * count:
+        return None
+    return dict(zip(fields[:count], fields[count:]))
+
+
+def load_palette(path=None):
+    """
+    Reads palette csv of hex,name rows and returns dict of hex to name.
+    Uses the compiled copy next to the csv when it matches the csv.
+    """
+    if path is None:
+        path = palette_path
+    stat = os.stat(path)
+    try:
+        palette = _read_compiled_palette(_compiled_path(path), stat)
+    except (OSError, struct.error):
+        palette = None
+    if palette is None:
+        palette = _read_csv_palette(path)
+    return palette
+
+
+def compile_palette(path=None):
+    """
+    Writes binary copy of palette csv next to it for faster loading. Returns path of the copy.
+    """
+    if path is None:
+        path = palette_path
+    stat = os.stat(path)
+    palette = _read_csv_palette(path)
+    for c, name in palette.items():
+        if not re_color.fullmatch(c):
+            raise ValueError('cannot compile palette color %r, expected #rrggbb' % c)
+        if '\0' in name:
+            raise ValueError('cannot compile palette name %r with a nul character' % name)
+    out = _compiled_path(path)
+    with open(out, 'wb') as f:
+        f.write(_palette_header.pack(_palette_magic, len(palette), stat.st_size, stat.st_mtime_ns))
+        f.write('\0'.join(list(palette) + list(palette.values())).encode('utf-8'))
+    return out
+
+
+def _color_names():
+    global color_names
+    loaded = 'color_names' in globals()
+    _count('palette', 'hits' if loaded else 'misses')
+    if not loaded:
+        color_names = load_palette()
+    return color_names
+
+
+def set_palette(palette):
+    """
+    Replaces the palette with dict of hex to name or path of palette csv.
+    When the lookup table is on, the table of the new palette is loaded or built.
+    """
+    global color_names, _palette_cache
+    if isinstance(palette, str):
+        palette = load_palette(palette)
+    color_names = dict(palette)
+    _palette_cache = None
+    if _lookup_table is not None:
+        use_lookup_table(cache_dir=_lookup_cache_dir, workers=_lookup_workers)
+
+
+def __getattr__(name):
+    # color_names is loaded the first time it is asked for
+    if name == 'color_names':
+        return _color_names()
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
 
+
+@_instrument
 def getColorName(color):
     # provide a hex value and get the name of the color
-    sim = [(similarity(color, c), name) for c, name in color_names.items()]
-    return max(sim, key=lambda x: x[0])[1]
\ No newline at end of file
+    if _lookup_table is not None:
+        key = int(''.join(re_color.match(color).groups()), 16)
+        return _palette_matrix()[0][_lookup_table[key]]
+    sim = [(similarity(color, c), name) for c, name in _color_names().items()]
+    return max(sim, key=lambda x: x[0])[1]
+
+# batch identification of color names
+# the palette is scored as a matrix so a whole block of inputs is compared
+# against every named color at once. the arithmetic follows similarity()
+# step for step so the chosen names are identical to getColorName.
+
+_palette_cache = None
+_sum_squares = None
+_compensated_sum = sys.version_info >= (3, 12)
+
+
+def _add(total, error, x):
+    # one step of sum() over floats. from python 3.12 sum() keeps the
+    # rounding error of each addition (neumaier's compensated summation) and
+    # adds it to the total at the end, so its result is not always the one
+    # of adding left to right
+    t = total + x
+    if _compensated_sum:
+        error = error + np.where(np.abs(total) >= np.abs(x), (total - t) + x, (x - t) + total)
+    return t, error
+
+
+def _sum3(x0, x1, x2):
+    # sum([x0, x1, x2]) over arrays, rounded the way sum() rounds on this python
+    total, error = _add(x0, 0.0, x1)
+    total, error = _add(total, error, x2)
+    return total + error
+
+
+def _square_sums(s):
+    # pow(x, 2) is not always x * x in the last bit, and channel sums can
+    # only take the values of sum() over three of the k/255.0, so the exact
+    # result of pow() is read from a table of every possible sum. after two
+    # channels sum() holds at most a few thousand distinct totals and errors,
+    # so the table is built from those instead of all 256**3 combinations
+    global _sum_squares
+    if _sum_squares is None:
+        c = np.arange(256) / 255.0
+        total, error = _add(c[:, None], 0.0, c[None, :])
+        pairs = np.unique(np.stack(np.broadcast_arrays(total, error), axis=-1).reshape(-1, 2), axis=0)
+        total, error = _add(pairs[:, 0, None], pairs[:, 1, None], c[None, :])
+        sums = np.unique(total + error)
+        squares = np.array([pow(x, 2) for x in sums.tolist()])
+        _sum_squares = (sums, squares)
+    sums, squares = _sum_squares
+    return squares[np.searchsorted(sums, s)]
+
+
+def _channel_stats(c):
+    # c is a (..., 3) float array of channels between 0 and 1
+    s = _sum3(c[..., 0], c[..., 1], c[..., 2])
+    sp = _sum3(c[..., 0] * c[..., 0], c[..., 1] * c[..., 1], c[..., 2] * c[..., 2])
+    return s, sp - _square_sums(s) / 3.0
+
+
+def _pearson(sp, s1, var1, s2, var2):
+    # the last step of similarity() over broadcast arrays of channel dot
+    # products, sums and variances. similarity() falls back to 0 when the
+    # square root or the division fails
+    denom = var1 * var2
+    valid = denom > 0
+    computed = np.zeros(denom.shape)
+    np.divide(sp - s1 * s2 / 3.0, np.sqrt(denom, where=valid, out=np.ones(denom.shape)),
+              where=valid, out=computed)
+    return computed
+
+
+def _palette_matrix():
+    """
+    Returns the palette names, channel matrix, channel sums and variances, computed once.
+    """
+    global _palette_cache
+    _count('palette_matrix', 'misses' if _palette_cache is None else 'hits')
+    if _palette_cache is None:
+        palette = _color_names()
+        names = list(palette.values())
+        rgb = hex2rgb_array(list(palette)) / 255.0
+        s, var = _channel_stats(rgb)
+        _palette_cache = (names, rgb, s, var)
+    return _palette_cache
+
+
+def _nearest_indices(c, palette, block=1024):
+    """
+    Takes (n, 3) float array of channels and the _palette_matrix() tuple and returns palette index
+    of best match for each row.
+    """
+    names, rgb, ps, pvar = palette
+    result = np.empty(len(c), dtype=np.intp)
+    for start in range(0, len(c), block):
+        chunk = c[start:start + block]
+        s, var = _channel_stats(chunk)
+        sp = _sum3(chunk[:, 0, None] * rgb[:, 0], chunk[:, 1, None] * rgb[:, 1], chunk[:, 2, None] * rgb[:, 2])
+        result[start:start + block] = _pearson(sp, s[:, None], var[:, None], ps, pvar).argmax(axis=1)
+    return result
+
+
+def _as_rgb(colors):
+    """
+    Takes list of hex strings, newline separated bytes or (n, 3) or (n, 4) integer array
+    and returns (n, 3) uint8 array. An alpha column is dropped.
+    """
+    if not isinstance(colors, np.ndarray) or colors.dtype.kind in 'OU':
+        return hex2rgb_array(colors)
+    if colors.ndim == 1 and colors.size == 0:
+        return np.zeros((0, 3), dtype=np.uint8)
+    if colors.dtype.kind not in 'iu':
+        raise ValueError('expected integer rgb array, got dtype %s' % colors.dtype)
+    if colors.ndim != 2 or colors.shape[1] not in (3, 4):
+        raise ValueError('expected (n, 3) or (n, 4) array, got shape %s' % (colors.shape,))
+    if colors.dtype != np.uint8:
+        if colors.size and (colors.min() < 0 or colors.max() > 255):
+            raise ValueError('rgb values must be between 0 and 255')
+        colors = colors.astype(np.uint8)
+    return colors[:, :3]
+
+
+@_instrument
+def get_color_names(colors, block=1024):
+    """
+    Takes list of hex strings, newline separated bytes or (n, 3) rgb array and returns list of color names.
+    Names match getColorName for every input.
+    """
+    palette = _palette_matrix()
+    rgb = _as_rgb(colors)
+    if _lookup_table is not None:
+        indices = _lookup_table[_lookup_keys(rgb)]
+    else:
+        indices = _nearest_indices(rgb / 255.0, palette, block)
+    return [palette[0][i] for i in indices]
+
+
+# precomputed lookup table
+# every 24 bit rgb value is mapped to its palette index once and saved as a
+# uint16 file named after a hash of the palette, the table version and how
+# sum() rounds on this python. the file is memory mapped read only, so worker
+# processes share the same pages, and a changed palette, scoring or
+# interpreter gets a new file instead of reusing a stale one.
+
+_lookup_table = None
+_lookup_cache_dir = None
+_lookup_workers = 1
+# bump when the scoring arithmetic or the file layout changes
+_lookup_version = 2
+
+
+def _lookup_keys(rgb):
+    rgb = rgb.astype(np.uint32)
+    return (rgb[:, 0] << 16) | (rgb[:, 1] << 8) | rgb[:, 2]
+
+
+def palette_hash():
+    """
+    Returns hex digest identifying the current palette.
+    """
+    import hashlib
+    digest = hashlib.sha1()
+    for c, name in _color_names().items():
+        digest.update(('%s,%s\n' % (c, name)).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+def lookup_table_path(cache_dir=None):
+    """
+    Returns path of the lookup table file for the current palette, table version and python.
+    """
+    if cache_dir is None:
+        cache_dir = os.environ.get('COLOR_FUNCTIONS_CACHE',
+                                   os.path.join(os.path.expanduser('~'), '.cache', 'color_functions'))
+    import hashlib
+    key = '%s,%d,%s' % (palette_hash(), _lookup_version, 'compensated' if _compensated_sum else 'sequential')
+    return os.path.join(cache_dir, 'color_names-%s.u16' % hashlib.sha1(key.encode('ascii')).hexdigest()[:16])
+
+
+def _lookup_block(start, block=1 << 16):
+    keys = np.arange(start, start + block, dtype=np.uint32)
+    rgb = np.stack([keys >> 16, (keys >> 8) & 0xff, keys & 0xff], axis=1)
+    return start, _nearest_indices(rgb / 255.0, _palette_matrix())
+
+
+def _init_lookup_worker(palette):
+    # workers started by spawn do not inherit a palette from set_palette()
+    global color_names, _palette_cache
+    color_names = palette
+    _palette_cache = None
+
+
+def build_lookup_table(path=None, block=1 << 16, workers=1):
+    """
+    Computes palette index of every rgb value and writes table to path. Returns path.
+    Every one of the 16.7 million colors is scored against the whole palette, which takes
+    about three minutes of CPU time with the bundled palette. workers > 1 splits the blocks
+    over a process pool.
+    """
+    import tempfile
+    if len(_color_names()) > 0xffff:
+        raise ValueError('palette has too many colors for a uint16 lookup table')
+    if path is None:
+        path = lookup_table_path()
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    # build next to the target and rename so readers never see a partial file
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(fd)
+    pool = None
+    try:
+        table = np.memmap(tmp, dtype='<u2', mode='w+', shape=(1 << 24,))
+        starts = range(0, 1 << 24, block)
+        if workers > 1:
+            import multiprocessing
+            pool = multiprocessing.Pool(workers, initializer=_init_lookup_worker, initargs=(_color_names(),))
+            blocks = pool.imap_unordered(functools.partial(_lookup_block, block=block), starts)
+        else:
+            blocks = (_lookup_block(start, block) for start in starts)
+        for start, indices in blocks:
+            table[start:start + block] = indices
+        table.flush()
+        del table
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return path
+
+
+def use_lookup_table(enabled=True, cache_dir=None, workers=1):
+    """
+    Turns the lookup table on or off for getColorName and get_color_names.
+    The table is built on first use, about three minutes of CPU time with the bundled
+    palette split over workers processes, and loaded with mmap afterwards. set_palette()
+    rebuilds it with the same cache_dir and workers.
+    """
+    global _lookup_table, _lookup_cache_dir, _lookup_workers
+    _lookup_cache_dir = cache_dir
+    _lookup_workers = workers
+    if not enabled:
+        _lookup_table = None
+        return
+    path = lookup_table_path(cache_dir)
+    built = os.path.exists(path)
+    _count('lookup_table', 'hits' if built else 'misses')
+    if not built:
+        build_lookup_table(path, workers=workers)
+    _lookup_table = np.memmap(path, dtype='<u2', mode='r', shape=(1 << 24,))
+
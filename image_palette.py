@@ -0,0 +1,218 @@
+# streaming palette extraction for images and video frames
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# pixels are read in fixed size chunks and only counted into a histogram of
+# colors reduced to a few bits per channel, along with the channel sums of
+# each bin. memory depends on the chunk size and the histogram alone, so
+# inputs larger than RAM stream through memory mapped files or pipes. the
+# palette is found by median cut, splitting boxes by variance, over the bins
+# at the end.
+
+import os
+import sys
+import time
+
+import numpy as np
+
+import color_functions as cf
+
+
+def iter_pixels(source, channels=3, chunk_pixels=1 << 20, offset=0):
+    """
+    Yields (n, channels) uint8 arrays of pixels from raw interleaved data.
+    source is a path (memory mapped), bytes-like object, numpy array or binary file object.
+    """
+    chunk = chunk_pixels * channels
+    if isinstance(source, (str, os.PathLike)):
+        # an empty file cannot be mapped and has no pixels, like b''
+        if os.path.getsize(source) <= offset:
+            return
+        source = np.memmap(source, dtype=np.uint8, mode='r', offset=offset)
+        offset = 0
+    if hasattr(source, 'readinto'):
+        if offset:
+            source.read(offset)
+        buf = bytearray(chunk)
+        view = memoryview(buf)
+        filled = 0
+        while True:
+            n = source.readinto(view[filled:])
+            if not n:
+                break
+            filled += n
+            if filled == chunk:
+                yield np.frombuffer(buf, dtype=np.uint8).reshape(-1, channels).copy()
+                filled = 0
+        if filled >= channels:
+            usable = filled - filled % channels
+            yield np.frombuffer(buf, dtype=np.uint8, count=usable).reshape(-1, channels).copy()
+        return
+    data = np.frombuffer(source, dtype=np.uint8) if not isinstance(source, np.ndarray) else source.reshape(-1)
+    data = data[offset:]
+    data = data[:len(data) - len(data) % channels]
+    for start in range(0, len(data), chunk):
+        yield np.asarray(data[start:start + chunk]).reshape(-1, channels)
+
+
+def _squared_error(coords, counts, box):
+    # squared distance of each channel from the box mean, weighted by pixels
+    w = counts[box].astype(np.float64)
+    x = coords[box].astype(np.float64)
+    mean = (w[:, None] * x).sum(axis=0) / w.sum()
+    return (w[:, None] * (x - mean) ** 2).sum(axis=0)
+
+
+class PaletteExtractor:
+    """
+    Accumulates a color histogram from chunks of pixels and extracts the top colors with their names.
+    names is the function naming an (n, 3) uint8 array, get_color_names by default.
+    """
+
+    def __init__(self, bits=5, names=None):
+        self.bits = bits
+        self.names = names if names is not None else cf.get_color_names
+        size = 1 << (3 * bits)
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.sums = np.zeros((size, 3), dtype=np.float64)
+        self.pixels = 0
+        self.seconds = 0.0
+        self.elapsed = 0.0
+
+    def update(self, pixels):
+        """
+        Adds (n, 3) or (n, 4) uint8 array of pixels. Fully transparent pixels are skipped.
+        """
+        start = time.perf_counter()
+        pixels = np.asarray(pixels, dtype=np.uint8)
+        if pixels.shape[1] == 4:
+            pixels = pixels[pixels[:, 3] > 0, :3]
+        shift = 8 - self.bits
+        q = (pixels >> shift).astype(np.intp)
+        index = (q[:, 0] << (2 * self.bits)) | (q[:, 1] << self.bits) | q[:, 2]
+        size = len(self.counts)
+        self.counts += np.bincount(index, minlength=size)
+        for j in range(3):
+            self.sums[:, j] += np.bincount(index, weights=pixels[:, j], minlength=size)
+        self.pixels += len(pixels)
+        self.seconds += time.perf_counter() - start
+
+    def pixels_per_second(self):
+        """
+        Returns throughput of the pixels added so far, including the reads when streamed by extract_palette.
+        """
+        seconds = self.elapsed or self.seconds
+        return self.pixels / seconds if seconds else 0.0
+
+    def _bins(self):
+        index = np.flatnonzero(self.counts)
+        mask = (1 << self.bits) - 1
+        coords = np.stack([index >> (2 * self.bits), (index >> self.bits) & mask, index & mask], axis=1)
+        return coords, self.counts[index], self.sums[index]
+
+    def palette(self, k=8):
+        """
+        Returns list of (hex, name, count) for the k most common colors by median cut split on variance.
+        """
+        coords, counts, sums = self._bins()
+        if not len(counts):
+            return []
+        boxes = [np.arange(len(counts))]
+        errors = [_squared_error(coords, counts, boxes[0]).sum()]
+        while len(boxes) < k:
+            # split the box whose colors are furthest from its mean, on the
+            # channel with the most spread, where the two halves have the
+            # least squared error
+            i = int(np.argmax(errors))
+            if errors[i] <= 0:
+                break
+            box = boxes.pop(i)
+            errors.pop(i)
+            channel = _squared_error(coords, counts, box).argmax()
+            box = box[np.argsort(coords[box, channel], kind='stable')]
+            x = coords[box, channel].astype(np.float64)
+            w = counts[box].astype(np.float64)
+            cw, cx, cxx = np.cumsum(w), np.cumsum(w * x), np.cumsum(w * x * x)
+            left = cxx[:-1] - cx[:-1] ** 2 / cw[:-1]
+            rw, rx, rxx = cw[-1] - cw[:-1], cx[-1] - cx[:-1], cxx[-1] - cxx[:-1]
+            right = rxx - rx ** 2 / rw
+            split = int(np.argmin(left + right)) + 1
+            for part in (box[:split], box[split:]):
+                boxes.append(part)
+                errors.append(_squared_error(coords, counts, part).sum())
+        population = np.array([counts[box].sum() for box in boxes])
+        means = np.array([sums[box].sum(axis=0) for box in boxes]) / population[:, None]
+        order = np.argsort(-population, kind='stable')
+        rgb = np.rint(means[order]).astype(np.uint8)
+        names = self.names(rgb)
+        return list(zip(cf.rgb2hex_array(rgb), names, population[order].tolist()))
+
+    def name_histogram(self):
+        """
+        Returns dict of color name to pixel count, most common first.
+        """
+        coords, counts, sums = self._bins()
+        if not len(counts):
+            return {}
+        rgb = np.rint(sums / counts[:, None]).astype(np.uint8)
+        totals = {}
+        for name, count in zip(self.names(rgb), counts.tolist()):
+            totals[name] = totals.get(name, 0) + count
+        return dict(sorted(totals.items(), key=lambda x: -x[1]))
+
+
+def extract_palette(source, k=8, channels=3, bits=5, chunk_pixels=1 << 20, offset=0, names=None):
+    """
+    Streams raw pixels from source and returns (palette, extractor).
+    palette is list of (hex, name, count); the extractor holds the histogram and throughput.
+    """
+    extractor = PaletteExtractor(bits, names)
+    start = time.perf_counter()
+    for pixels in iter_pixels(source, channels, chunk_pixels, offset):
+        extractor.update(pixels)
+    extractor.elapsed = time.perf_counter() - start
+    return extractor.palette(k), extractor
+
+
+if __name__ == '__main__':
+    import argparse
+    parser = argparse.ArgumentParser(description='Extract the named palette of raw RGB or RGBA pixels.')
+    parser.add_argument('path', nargs='?', help='raw pixel file, stdin when omitted')
+    parser.add_argument('-k', type=int, default=8, help='number of palette colors')
+    parser.add_argument('--channels', type=int, choices=(3, 4), default=3)
+    parser.add_argument('--offset', type=int, default=0, help='bytes to skip, e.g. a header')
+    parser.add_argument('--chunk', type=int, default=1 << 20, help='pixels per chunk')
+    parser.add_argument('--names', action='store_true', help='print the color name histogram too')
+    args = parser.parse_args()
+    source = args.path if args.path else sys.stdin.buffer
+    palette, extractor = extract_palette(source, args.k, args.channels, chunk_pixels=args.chunk,
+                                         offset=args.offset)
+    for hexval, name, count in palette:
+        print('%s\t%s\t%d' % (hexval, name, count))
+    if args.names:
+        for name, count in extractor.name_histogram().items():
+            print('%s\t%d' % (name, count))
+    print('%d pixels in %.2f sec, %.0f pixels/sec' % (extractor.pixels, extractor.elapsed,
+                                                      extractor.pixels_per_second()), file=sys.stderr)
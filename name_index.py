@@ -0,0 +1,206 @@
+# color name lookup, name to hex
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# the index is built once per palette. names are matched case and space
+# insensitively. a name can belong to several colors ('light gray', 'tea
+# rose', 'vermilion'), so lookups return every hex for it. prefix search
+# bisects sorted lists of the names and of their later words, and fuzzy search
+# shortlists names sharing trigrams with the query before computing edit
+# distances, so neither scans the palette. short misspellings share few
+# trigrams with their name ('poal' and 'opal' share none), so short names are
+# also indexed by every string left after deleting up to two of their
+# letters. a query within two edits of a name shares one of those strings
+# with it, and 'poal' and 'opal' both become 'pal'.
+
+from bisect import bisect_left
+from collections import Counter
+
+import color_functions as cf
+
+
+# letters deleted from short names for the fuzzy search index
+_depth = 2
+
+
+def _normalize(name):
+    return ' '.join(name.casefold().split())
+
+
+def _trigrams(text):
+    text = '  %s ' % text
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _deletions(text, depth):
+    # every string left after deleting up to depth letters of text
+    found = frontier = {text}
+    for _ in range(depth):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        found = found | frontier
+    return found
+
+
+def edit_distance(a, b, max_distance=None):
+    """
+    Returns number of insertions, deletions, substitutions and adjacent transpositions turning a into b.
+    With max_distance, stops early and returns max_distance + 1 once the distance is larger.
+    """
+    if max_distance is not None and abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        # later rows build on the last two, so once both are over the limit
+        # the distance is too
+        if max_distance is not None and min(current) > max_distance and min(previous) > max_distance:
+            return max_distance + 1
+    if max_distance is not None:
+        return min(current[-1], max_distance + 1)
+    return current[-1]
+
+
+class NameIndex:
+    """
+    Exact, prefix and fuzzy lookup of color names over a palette, built once.
+    palette is a dict of hex to name, a palette csv path, or the current palette when omitted.
+    Names of up to short + 2 characters are indexed for fuzzy search of queries of up to short.
+    """
+
+    def __init__(self, palette=None, short=5):
+        if palette is None:
+            palette = cf.color_names
+        elif isinstance(palette, str):
+            palette = cf.load_palette(palette)
+        self.palette = palette
+        self.hexes = {}
+        for c, name in palette.items():
+            self.hexes.setdefault(_normalize(name), []).append(c)
+        self.names = list(self.hexes)
+        self._sorted = sorted(self.names)
+        # later word starts of every name, so 'blue' also finds 'alice blue'
+        words = sorted((name[j + 1:], name) for name in self.names
+                       for j, ch in enumerate(name) if ch in ' -')
+        self._words = [word for word, name in words]
+        self._word_names = [name for word, name in words]
+        self.short = short
+        self._trigram_ids = {}
+        self._deletion_ids = {}
+        self._length_ids = {}
+        for i, name in enumerate(self.names):
+            for gram in _trigrams(name):
+                self._trigram_ids.setdefault(gram, []).append(i)
+            if len(name) <= short + _depth:
+                for word in _deletions(name, _depth):
+                    self._deletion_ids.setdefault(word, []).append(i)
+            self._length_ids.setdefault(len(name), []).append(i)
+
+    def exact(self, name):
+        """
+        Returns list of hex values named name, empty when there is none.
+        """
+        return list(self.hexes.get(_normalize(name), ()))
+
+    def prefix(self, text, limit=10):
+        """
+        Returns up to limit names with a word starting with text, names starting with text first.
+        """
+        text = _normalize(text)
+        found = []
+        i = bisect_left(self._sorted, text)
+        while len(found) < limit and i < len(self._sorted) and self._sorted[i].startswith(text):
+            found.append(self._sorted[i])
+            i += 1
+        i = bisect_left(self._words, text)
+        while len(found) < limit and i < len(self._words) and self._words[i].startswith(text):
+            if self._word_names[i] not in found:
+                found.append(self._word_names[i])
+            i += 1
+        return found
+
+    def fuzzy(self, text, limit=5, max_distance=2, candidates=None):
+        """
+        Returns up to limit (name, distance) pairs within max_distance edits of text, closest first.
+        candidates names sharing the most trigrams are compared, by default 50 or 5% of the palette
+        if more. Texts of up to short characters are also compared with every name sharing a
+        deletion, or every name of similar length when max_distance is over 2.
+        """
+        text = _normalize(text)
+        if candidates is None:
+            candidates = max(50, len(self.names) // 20)
+        shared = Counter()
+        for gram in _trigrams(text):
+            shared.update(self._trigram_ids.get(gram, ()))
+        shortlist = dict(shared.most_common(candidates))
+        if len(text) <= self.short and max_distance <= _depth:
+            for word in _deletions(text, max_distance):
+                for i in self._deletion_ids.get(word, ()):
+                    shortlist.setdefault(i, shared[i])
+        elif len(text) <= self.short:
+            for n in range(len(text) - max_distance, len(text) + max_distance + 1):
+                for i in self._length_ids.get(n, ()):
+                    shortlist.setdefault(i, shared[i])
+        matches = []
+        for i, count in shortlist.items():
+            name = self.names[i]
+            distance = edit_distance(text, name, max_distance)
+            if distance <= max_distance:
+                matches.append((distance, -count, name))
+        matches.sort()
+        return [(name, distance) for distance, count, name in matches[:limit]]
+
+
+_default_index = None
+
+
+def _index():
+    global _default_index
+    # rebuilt when set_palette() has replaced the palette
+    if _default_index is None or _default_index.palette is not cf.color_names:
+        _default_index = NameIndex()
+    return _default_index
+
+
+def getColorHex(name):
+    """
+    Takes color name and returns list of its hex values.
+    """
+    return _index().exact(name)
+
+
+def suggest(text, limit=10):
+    """
+    Takes partial or misspelled color name and returns list of matching names for autocomplete.
+    """
+    index = _index()
+    found = index.prefix(text, limit)
+    if len(found) < limit:
+        found += [name for name, distance in index.fuzzy(text, limit) if name not in found]
+    return found[:limit]
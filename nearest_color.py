@@ -0,0 +1,315 @@
+# nearest color search with selectable metrics
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+import numpy as np
+
+import color_functions as cf
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+
+# color space conversion
+
+_srgb_to_xyz = np.array([[0.4124564, 0.3575761, 0.1804375],
+                         [0.2126729, 0.7151522, 0.0721750],
+                         [0.0193339, 0.1191920, 0.9503041]])
+_d65_white = np.array([0.95047, 1.0, 1.08883])
+
+
+def rgb2lab(rgb):
+    """
+    Takes (n, 3) uint8 array and converts to (n, 3) CIELAB array under D65.
+    """
+    c = np.asarray(rgb, dtype=np.float64).reshape(-1, 3) / 255.0
+    linear = np.where(c <= 0.04045, c / 12.92, ((c + 0.055) / 1.055) ** 2.4)
+    t = (linear @ _srgb_to_xyz.T) / _d65_white
+    delta = 6.0 / 29.0
+    f = np.where(t > delta ** 3, np.cbrt(t), t / (3 * delta ** 2) + 4.0 / 29.0)
+    return np.stack([116.0 * f[:, 1] - 16.0,
+                     500.0 * (f[:, 0] - f[:, 1]),
+                     200.0 * (f[:, 1] - f[:, 2])], axis=1)
+
+
+def delta_e_2000(lab1, lab2):
+    """
+    Computes CIEDE2000 color difference between broadcastable arrays of CIELAB colors.
+    """
+    L1, a1, b1 = np.moveaxis(np.asarray(lab1, dtype=np.float64), -1, 0)
+    L2, a2, b2 = np.moveaxis(np.asarray(lab2, dtype=np.float64), -1, 0)
+    C1 = np.hypot(a1, b1)
+    C2 = np.hypot(a2, b2)
+    Cbar7 = ((C1 + C2) / 2.0) ** 7
+    G = 0.5 * (1.0 - np.sqrt(Cbar7 / (Cbar7 + 25.0 ** 7)))
+    a1p = (1.0 + G) * a1
+    a2p = (1.0 + G) * a2
+    C1p = np.hypot(a1p, b1)
+    C2p = np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360.0
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360.0
+    chroma = C1p * C2p
+    dLp = L2 - L1
+    dCp = C2p - C1p
+    dhp = h2p - h1p
+    dhp = np.where(dhp > 180.0, dhp - 360.0, np.where(dhp < -180.0, dhp + 360.0, dhp))
+    dhp = np.where(chroma == 0, 0.0, dhp)
+    dHp = 2.0 * np.sqrt(chroma) * np.sin(np.radians(dhp / 2.0))
+    Lbarp = (L1 + L2) / 2.0
+    Cbarp = (C1p + C2p) / 2.0
+    hsum = h1p + h2p
+    hbarp = np.where(np.abs(h1p - h2p) <= 180.0, hsum / 2.0,
+                     np.where(hsum < 360.0, (hsum + 360.0) / 2.0, (hsum - 360.0) / 2.0))
+    hbarp = np.where(chroma == 0, hsum, hbarp)
+    T = (1.0 - 0.17 * np.cos(np.radians(hbarp - 30.0)) + 0.24 * np.cos(np.radians(2.0 * hbarp))
+         + 0.32 * np.cos(np.radians(3.0 * hbarp + 6.0)) - 0.20 * np.cos(np.radians(4.0 * hbarp - 63.0)))
+    dtheta = 30.0 * np.exp(-((hbarp - 275.0) / 25.0) ** 2)
+    Cbarp7 = Cbarp ** 7
+    Rc = 2.0 * np.sqrt(Cbarp7 / (Cbarp7 + 25.0 ** 7))
+    Sl = 1.0 + 0.015 * (Lbarp - 50.0) ** 2 / np.sqrt(20.0 + (Lbarp - 50.0) ** 2)
+    Sc = 1.0 + 0.045 * Cbarp
+    Sh = 1.0 + 0.015 * Cbarp * T
+    Rt = -np.sin(np.radians(2.0 * dtheta)) * Rc
+    return np.sqrt((dLp / Sl) ** 2 + (dCp / Sc) ** 2 + (dHp / Sh) ** 2
+                   + Rt * (dCp / Sc) * (dHp / Sh))
+
+
+def _rgb_points(rgb):
+    return np.asarray(rgb, dtype=np.float64).reshape(-1, 3)
+
+
+def _similarity(c1, c2):
+    # similarity() from color_functions over broadcast arrays of channels,
+    # with the same arithmetic so near ties resolve the same way
+    s1, var1 = cf._channel_stats(c1)
+    s2, var2 = cf._channel_stats(c2)
+    sp = cf._sum3(c1[..., 0] * c2[..., 0], c1[..., 1] * c2[..., 1], c1[..., 2] * c2[..., 2])
+    return cf._pearson(sp, s1, var1, s2, var2)
+
+
+def _pearson_points(rgb):
+    # the pearson coefficient of two colors is the dot product of their
+    # centered and normalized channel vectors, so the most similar colors are
+    # the nearest ones among those unit vectors. distances for this metric
+    # are 1 - similarity()
+    c = _rgb_points(rgb) / 255.0
+    c = c - c.mean(axis=1, keepdims=True)
+    norm = np.linalg.norm(c, axis=1, keepdims=True)
+    return np.divide(c, norm, out=np.zeros_like(c), where=norm > 0)
+
+
+def _euclidean(a, b):
+    return np.sqrt(((a - b) ** 2).sum(axis=-1))
+
+
+# metrics map a name to the transform into the space searched by the index
+# and an optional exact distance used to rerank the index candidates
+_metrics = {
+    'euclidean': (_rgb_points, None),
+    'cie76': (rgb2lab, None),
+    'ciede2000': (rgb2lab, delta_e_2000),
+    'pearson': (_pearson_points, None),
+}
+
+
+def register_metric(name, transform, rerank=None):
+    """
+    Adds metric that searches transform(rgb) by euclidean distance, optionally reranked by rerank(a, b).
+    """
+    _metrics[name] = (transform, rerank)
+
+
+def metrics():
+    """
+    Returns list of available metric names.
+    """
+    return list(_metrics)
+
+
+class _KDIndex:
+    """
+    KD-tree with the cKDTree query interface, used when scipy is not installed.
+
+    The points are split at the median of their widest axis into leaves of
+    about sqrt(n) points. A query orders the leaves by the distance to their
+    bounding boxes and visits them nearest first until the next box is
+    further than the k-th best point found, with every query of a block
+    visiting its next leaf in the same step.
+    """
+
+    def __init__(self, points, block=1024):
+        self.points = points
+        self.block = block
+        size = max(64, int(np.sqrt(len(points))))
+        leaves = []
+        stack = [np.arange(len(points))]
+        while stack:
+            index = stack.pop()
+            if len(index) <= size:
+                leaves.append(index)
+                continue
+            axis = np.ptp(points[index], axis=0).argmax()
+            index = index[np.argsort(points[index, axis], kind='stable')]
+            half = len(index) // 2
+            stack += [index[half:], index[:half]]
+        # leaves are padded to the same size with points at infinity
+        self.leaf_index = np.full((len(leaves), size), -1, dtype=np.intp)
+        self.leaf_points = np.full((len(leaves), size, points.shape[1]), np.inf)
+        for i, index in enumerate(leaves):
+            self.leaf_index[i, :len(index)] = index
+            self.leaf_points[i, :len(index)] = points[index]
+        self.lower = np.array([points[index].min(axis=0) for index in leaves])
+        self.upper = np.array([points[index].max(axis=0) for index in leaves])
+
+    def query(self, x, k=1):
+        k = min(k, len(self.points))
+        distances = np.empty((len(x), k))
+        indices = np.empty((len(x), k), dtype=np.intp)
+        for start in range(0, len(x), self.block):
+            d, i = self._query(x[start:start + self.block], k)
+            distances[start:start + self.block] = np.sqrt(d)
+            indices[start:start + self.block] = i
+        return distances, indices
+
+    def _query(self, x, k):
+        # squared distances from each query to each leaf's bounding box
+        gap = np.maximum(self.lower[None, :, :] - x[:, None, :], 0) + \
+            np.maximum(x[:, None, :] - self.upper[None, :, :], 0)
+        bound = (gap ** 2).sum(axis=2)
+        order = bound.argsort(axis=1, kind='stable')
+        best = np.full((len(x), k), np.inf)
+        best_index = np.full((len(x), k), -1, dtype=np.intp)
+        active = np.arange(len(x))
+        for step in range(len(self.lower)):
+            leaf = order[active, step]
+            d = ((self.leaf_points[leaf] - x[active, None, :]) ** 2).sum(axis=2)
+            d = np.hstack([best[active], d])
+            i = np.hstack([best_index[active], self.leaf_index[leaf]])
+            keep = np.argpartition(d, k - 1, axis=1)[:, :k]
+            best[active] = np.take_along_axis(d, keep, axis=1)
+            best_index[active] = np.take_along_axis(i, keep, axis=1)
+            if step + 1 == len(self.lower):
+                break
+            active = active[bound[active, order[active, step + 1]] <= best[active].max(axis=1)]
+            if not len(active):
+                break
+        rank = np.lexsort((best_index, best), axis=1)
+        return np.take_along_axis(best, rank, axis=1), np.take_along_axis(best_index, rank, axis=1)
+
+
+class NearestColor:
+    """
+    Nearest named color search over a palette with a selectable metric.
+
+    The palette is transformed and indexed once, in scipy's KD-tree when it
+    is installed and in _KDIndex otherwise. Each query takes the nearest
+    candidates from the index and orders them by the metric's exact
+    distance, so ciede2000 is searched through its CIELAB neighbours and
+    ties go to the earlier palette color.
+    candidates=None skips the index and scores every palette color.
+    """
+
+    def __init__(self, palette=None, metric='euclidean', candidates=32):
+        if metric not in _metrics:
+            raise ValueError('unknown metric %r, expected one of %s' % (metric, ', '.join(_metrics)))
+        if palette is None:
+            palette = cf.color_names
+        elif isinstance(palette, str):
+            palette = cf.load_palette(palette)
+        items = list(palette.items()) if isinstance(palette, dict) else list(palette)
+        self.metric = metric
+        self.hexes = [c for c, name in items]
+        self.names = [name for c, name in items]
+        self.rgb = cf._as_rgb(self.hexes)
+        self.candidates = candidates
+        self._transform, self._rerank = _metrics[metric]
+        self.points = self._transform(self.rgb)
+        if metric == 'pearson':
+            # grays have no direction to index. similarity() scores them with
+            # rounding noise, so they are kept aside and always scored exactly
+            self._gray = np.flatnonzero(~self.points.any(axis=1))
+            self.points_index = np.flatnonzero(self.points.any(axis=1))
+        else:
+            self.points_index = np.arange(len(self.points))
+        # a pearson palette of grays leaves nothing to index, and the grays
+        # are scored exactly instead
+        self.index = None
+        if len(self.points_index):
+            self.index = (cKDTree if cKDTree is not None else _KDIndex)(self.points[self.points_index])
+
+    def query(self, colors, k=1, block=1 << 20):
+        """
+        Takes list of hex strings or (n, 3) rgb array and returns (distances, indices) of k nearest colors.
+
+        euclidean, cie76 and pearson are exact. ciede2000 is approximate: only
+        the candidates nearest by CIE76 are scored, and a color outside them
+        with a smaller CIEDE2000 difference is missed. More candidates miss
+        fewer, and candidates=None scores the whole palette exactly.
+        """
+        rgb = cf._as_rgb(colors)
+        width = len(self.points_index) if self.candidates is None else self.candidates
+        width = min(max(k, width), len(self.points_index))
+        # rows are scored in blocks of about block candidate distances
+        rows = max(1, block // max(width, 1))
+        parts = [self._query(rgb[start:start + rows], k, width) for start in range(0, max(len(rgb), 1), rows)]
+        return np.vstack([d for d, i in parts]), np.vstack([i for d, i in parts])
+
+    def _query(self, rgb, k, width):
+        x = self._transform(rgb)
+        if width == len(self.points_index):
+            indices = np.tile(self.points_index, (len(x), 1))
+        else:
+            indices = self.index.query(x, k=width)[1]
+            indices = self.points_index[np.asarray(indices).reshape(len(x), width)]
+        if self.metric == 'pearson':
+            indices = np.hstack([indices, np.broadcast_to(self._gray, (len(x), len(self._gray)))])
+            distances = self._pearson_distances(rgb, indices)
+        else:
+            distances = (self._rerank or _euclidean)(x[:, None, :], self.points[indices])
+        # candidates are ordered by their exact distance and equal distances
+        # by palette order, the way getColorName keeps the first best match
+        order = np.lexsort((indices, distances), axis=1)[:, :k]
+        return np.take_along_axis(distances, order, axis=1), np.take_along_axis(indices, order, axis=1)
+
+    def _pearson_distances(self, rgb, indices):
+        # distances are 1 - similarity(). gray inputs have no direction
+        # either, so their candidates are replaced by a scan of the palette
+        distances = 1.0 - _similarity(rgb[:, None, :] / 255.0, self.rgb[indices] / 255.0)
+        gray = np.flatnonzero((rgb[:, 0] == rgb[:, 1]) & (rgb[:, 1] == rgb[:, 2]))
+        if len(gray):
+            full = 1.0 - _similarity(rgb[gray, None, :] / 255.0, self.rgb / 255.0)
+            palette = np.broadcast_to(np.arange(len(self.rgb)), full.shape)
+            best = np.lexsort((palette, full), axis=1)[:, :indices.shape[1]]
+            indices[gray] = best
+            distances[gray] = np.take_along_axis(full, best, axis=1)
+        return distances
+
+    def get_color_names(self, colors):
+        """
+        Takes list of hex strings or (n, 3) rgb array and returns list of nearest color names.
+        """
+        return [self.names[i] for i in self.query(colors)[1][:, 0]]
@@ -0,0 +1,66 @@
+# tests for benchmark
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+# usage: python -m pytest -q
+
+import json
+
+import benchmark
+
+
+def _result(name, seconds, size=1000, palette=None):
+    return {'name': name, 'kind': 'batch', 'size': size, 'palette': palette, 'seconds': seconds,
+            'min_seconds': seconds, 'items_per_second': size / seconds if seconds else None}
+
+
+def test_compare():
+    baseline = {'results': [_result('hex2rgb_array', 1.0), _result('rgb2hex_array', 1.0),
+                            _result('get_color_names', 1.0, palette=5000), _result('harmonies', 0.0)]}
+    report = {'results': [_result('hex2rgb_array', 1.1), _result('rgb2hex_array', 2.0),
+                          _result('get_color_names', 3.0, palette=30000), _result('harmonies', 1.0)]}
+    slower = benchmark.compare(report, baseline, 1.2)
+    assert [result['name'] for result in slower] == ['rgb2hex_array']
+    first, second, other, zero = report['results']
+    assert first['ratio'] == 1.1 and first['baseline_seconds'] == 1.0
+    assert second['ratio'] == 2.0
+    # different palette sizes and zero baselines are not compared
+    assert 'ratio' not in other and 'ratio' not in zero
+
+
+def test_run_and_regression_exit(tmp_path, capsys):
+    output = tmp_path / 'results.json'
+    assert benchmark.main(['--quick', '--filter', 'rgb2hex_array', '--repeat', '1', '-o', str(output)]) == 0
+    report = json.loads(output.read_text())
+    assert [(result['name'], result['size']) for result in report['results']] == \
+        [('rgb2hex_array', 1000), ('rgb2hex_array', 10000)]
+    for result in report['results']:
+        result['seconds'] /= 1000.0
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps(report))
+    assert benchmark.main(['--quick', '--filter', 'rgb2hex_array', '--repeat', '1',
+                           '--baseline', str(baseline)]) == 1
+    assert '2 regressions' in capsys.readouterr().err
@@ -0,0 +1,256 @@
+# tests for color_functions
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+# usage: python -m pytest -q
+#
+# the batch functions are checked against the scalar functions they replace
+# on seeded random colors and all 256 grays, where ties are most likely.
+
+import numpy as np
+import pytest
+
+import color_functions as cf
+
+
+def _sample(n, seed=20240101):
+    rng = np.random.default_rng(seed)
+    grays = np.repeat(np.arange(256, dtype=np.uint8)[:, None], 3, axis=1)
+    return np.vstack([rng.integers(0, 256, (n, 3), dtype=np.uint8), grays])
+
+
+@pytest.fixture
+def small_palette(tmp_path, monkeypatch):
+    # a few colors keep the full lookup table build to seconds
+    monkeypatch.setenv('COLOR_FUNCTIONS_CACHE', str(tmp_path))
+    cf.set_palette({'#000000': 'black', '#ffffff': 'white', '#ff0000': 'red', '#00ff00': 'green',
+                    '#0000ff': 'blue', '#808080': 'gray', '#ffa500': 'orange', '#800080': 'purple'})
+    yield
+    cf.use_lookup_table(False)
+    cf.set_palette(cf.load_palette())
+
+
+def test_hex_round_trip():
+    rgb = _sample(1000)
+    hexes = cf.rgb2hex_array(rgb)
+    assert hexes == [cf.rgb2hex(tuple(c)) for c in rgb.tolist()]
+    assert (cf.hex2rgb_array(hexes) == rgb).all()
+    assert cf.hex2rgb_array(b'\n'.join(h.encode() for h in hexes)).tolist() == rgb.tolist()
+    assert [tuple(c) for c in cf.hex2rgb_array(['#abc', 'ABCDEF']).tolist()] == \
+        [cf.hex2rgb('#abc'), cf.hex2rgb('ABCDEF')]
+
+
+def test_hex_invalid_rows():
+    rgb, invalid = cf.hex2rgb_array(['#010203', '#01\n0203', 'zz', ''], errors='mask')
+    assert invalid.tolist() == [1, 2, 3]
+    assert rgb[0].tolist() == [1, 2, 3]
+    with pytest.raises(ValueError):
+        cf.hex2rgb_array(['#01\n0203'])
+    assert cf.rgb2hex_array(np.empty((0, 3), dtype=np.uint8)) == []
+    with pytest.raises(ValueError):
+        cf.rgb2hex_array(np.zeros(3, dtype=np.uint8))
+
+
+def test_get_color_names_matches_getColorName():
+    rgb = _sample(300)
+    hexes = cf.rgb2hex_array(rgb)
+    assert cf.get_color_names(rgb) == [cf.getColorName(c) for c in hexes]
+
+
+@pytest.mark.parametrize('scheme', ['complimentary', 'splitComplimentary', 'analogous', 'triadic', 'tetradic'])
+def test_harmonies_match_scalar(scheme):
+    rgb = _sample(2000)
+    hexes = cf.rgb2hex_array(rgb)
+    if scheme == 'analogous':
+        expected = [cf.analogous(c, 30) for c in hexes]
+        result = cf.harmonies(rgb, scheme, 30)
+    else:
+        expected = [getattr(cf, scheme)(c) for c in hexes]
+        if scheme == 'complimentary':
+            expected = [[c] for c in expected]
+        result = cf.harmonies(rgb, scheme)
+    assert result.tolist() == expected
+
+
+def test_lookup_table_matches_scan(small_palette):
+    rgb = _sample(2000)
+    expected = cf.get_color_names(rgb)
+    cf.use_lookup_table()
+    assert cf.get_color_names(rgb) == expected
+    assert [cf.getColorName(c) for c in cf.rgb2hex_array(rgb[:200])] == expected[:200]
+
+
+def test_palette_csv_rows(tmp_path):
+    path = tmp_path / 'palette.csv'
+    path.write_text('#000000,black\n\n#ffffff,white\n')
+    assert cf.load_palette(str(path)) == {'#000000': 'black', '#ffffff': 'white'}
+    path.write_text('#000000,black\n#ffffff\n')
+    with pytest.raises(ValueError, match='line 2'):
+        cf.load_palette(str(path))
+
+
+def test_rgb_array_inputs():
+    rgba = np.array([[255, 0, 0, 255], [0, 255, 0, 0], [0, 0, 255, 9]], dtype=np.uint8)
+    assert cf.get_color_names(rgba) == cf.get_color_names(['#ff0000', '#00ff00', '#0000ff'])
+    assert cf.harmonies(rgba, 'triadic').shape == (3, 2, 3)
+    assert cf.get_color_names(np.array([[1, 2, 3]])) == cf.get_color_names(['#010203'])
+    for bad in (np.zeros((3, 5), dtype=np.uint8), np.zeros(3, dtype=np.uint8),
+                np.array([[1.0, 2.0, 3.0]]), np.array([[1, 2, 256]])):
+        with pytest.raises(ValueError):
+            cf.get_color_names(bad)
+
+
+def test_instrumentation_counts(small_palette):
+    cf.enable_instrumentation()
+    try:
+        cf.reset_instrumentation()
+        cf.get_color_names(['#ff0000', '#00ff00'])
+        cf.get_color_names(['#0000ff'])
+        cf.getColorName('#ff0000')
+        stats = cf.instrumentation_stats()
+        cf.use_lookup_table()
+        cf.use_lookup_table()
+        table = cf.instrumentation_stats()['cache']['lookup_table']
+    finally:
+        cf.enable_instrumentation(False)
+    assert stats['calls']['get_color_names']['calls'] == 2
+    assert stats['calls']['getColorName']['calls'] == 1
+    cache = stats['cache']
+    assert cache['palette_matrix'] == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+    assert cache['palette'] == {'hits': 2, 'misses': 0, 'hit_rate': 1.0}
+    assert cache['lookup_table'] == {'hits': 0, 'misses': 0, 'hit_rate': None}
+    assert table == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+    assert cf.instrumentation_stats() is None
+
+
+def test_lookup_table_parallel_build(small_palette, tmp_path):
+    serial = cf.build_lookup_table(str(tmp_path / 'serial.u16'))
+    parallel = cf.build_lookup_table(str(tmp_path / 'parallel.u16'), workers=2)
+    with open(serial, 'rb') as f1, open(parallel, 'rb') as f2:
+        assert f1.read() == f2.read()
+
+
+def test_palette_loads_lazily():
+    import subprocess
+    import sys
+    probe = ('import sys, color_functions as cf; before = "color_names" in vars(cf); cf.getColorName("#ff0000"); '
+             'print(before, "numpy" in sys.modules, "color_names" in vars(cf))')
+    result = subprocess.run([sys.executable, '-c', probe], cwd=cf.os.path.dirname(cf.__file__),
+                            capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ['False', 'False', 'True']
+
+
+def test_compiled_palette(tmp_path):
+    path = tmp_path / 'palette.csv'
+    path.write_text('#000000,black\n#ffffff,white\n#ff0000,Rot é\n')
+    compiled = cf.compile_palette(str(path))
+    assert compiled == str(tmp_path / 'palette.bin')
+    expected = {'#000000': 'black', '#ffffff': 'white', '#ff0000': 'Rot é'}
+    assert cf._read_compiled_palette(compiled, cf.os.stat(str(path))) == expected
+    # a changed csv makes the compiled copy stale, so the csv is read instead
+    path.write_text('#000000,black\n#0000ff,blue\n')
+    assert cf._read_compiled_palette(compiled, cf.os.stat(str(path))) is None
+    assert cf.load_palette(str(path)) == {'#000000': 'black', '#0000ff': 'blue'}
+    path.write_text('#000,black\n')
+    with pytest.raises(ValueError):
+        cf.compile_palette(str(path))
+
+
+def test_hex_alpha_and_bytes():
+    rgba = cf.hex2rgb_array(['#11223344', '#123', '#1234', 'aabbcc'], alpha=True)
+    assert rgba.tolist() == [[0x11, 0x22, 0x33, 0x44], [0x11, 0x22, 0x33, 255],
+                             [0x11, 0x22, 0x33, 0x44], [0xaa, 0xbb, 0xcc, 255]]
+    assert cf.rgb2hex_array(rgba) == ['#11223344', '#112233ff', '#11223344', '#aabbccff']
+    assert cf.rgb2hex_array(rgba[:, :3], as_bytes=True) == b'#112233\n#112233\n#112233\n#aabbcc\n'
+    rgb, invalid = cf.hex2rgb_array(b'#010203\r\n\r\n#0g0000\n#040506\n', errors='mask')
+    assert rgb.tolist() == [[1, 2, 3], [0, 0, 0], [0, 0, 0], [4, 5, 6]]
+    assert invalid.tolist() == [1, 2]
+    assert cf.hex2rgb_array([]).shape == (0, 3)
+    assert cf.hex2rgb_array(b'', alpha=True).shape == (0, 4)
+    with pytest.raises(ValueError):
+        cf.hex2rgb_array(['#000000'], errors='ignore')
+
+
+def test_harmonies_angles():
+    rgb = _sample(500)
+    hexes = cf.rgb2hex_array(rgb)
+    assert cf.harmonies(rgb, 'analogous', 45).tolist() == [cf.analogous(c, 45) for c in hexes]
+    assert cf.harmonies(hexes, 'triadic', (120.0, 240.0)).tolist() == [cf.triadic(c) for c in hexes]
+    assert cf.harmonies(rgb, 'complimentary', 90).shape == (len(rgb), 1, 3)
+    assert cf.harmonies(np.zeros((0, 3), dtype=np.uint8), 'tetradic').shape == (0, 3, 3)
+    with pytest.raises(ValueError):
+        cf.harmonies(rgb, 'square')
+
+
+def test_hls_arrays_match_colorsys():
+    import colorsys
+    rgb = _sample(2000)
+    hls = cf.rgb2hls_array(rgb)
+    assert hls.tolist() == [list(colorsys.rgb_to_hls(*(x / 255.0 for x in c))) for c in rgb.tolist()]
+    assert cf.hls2rgb_array(hls).tolist() == [list(colorsys.hls_to_rgb(*c)) for c in hls.tolist()]
+
+
+def test_sum3_matches_sum():
+    # sum() compensates rounding errors from python 3.12, so the batch
+    # arithmetic must follow whichever interpreter runs the tests
+    rng = np.random.default_rng(20240101)
+    for x in (_sample(5000) / 255.0, (_sample(5000) / 255.0) ** 2, rng.random((5000, 3)) * 1e3):
+        assert cf._sum3(x[:, 0], x[:, 1], x[:, 2]).tolist() == [sum(row) for row in x.tolist()]
+
+
+def test_lookup_table_path_versions(small_palette, monkeypatch):
+    version = cf._lookup_version
+    path = cf.lookup_table_path('cache')
+    monkeypatch.setattr(cf, '_lookup_version', version + 1)
+    assert cf.lookup_table_path('cache') != path
+    monkeypatch.setattr(cf, '_lookup_version', version)
+    assert cf.lookup_table_path('cache') == path
+    monkeypatch.setattr(cf, '_compensated_sum', not cf._compensated_sum)
+    assert cf.lookup_table_path('cache') != path
+
+
+def test_set_palette_keeps_lookup_workers(small_palette, monkeypatch):
+    builds = []
+    build = cf.build_lookup_table
+    monkeypatch.setattr(cf, 'build_lookup_table', lambda path, workers=1: builds.append(workers) or build(path, workers=workers))
+    cf.use_lookup_table(workers=2)
+    cf.set_palette({'#000000': 'black', '#ffffff': 'white'})
+    assert builds == [2, 2]
+    cf.set_palette({'#ff0000': 'red', '#00ff00': 'green'})
+    assert builds == [2, 2, 2]
+    assert cf.get_color_names(['#f00101', '#02fe00']) == ['red', 'green']
+
+
+def test_compiled_palette_loads_faster(tmp_path):
+    import shutil
+    import timeit
+    path = str(tmp_path / 'colors.csv')
+    shutil.copyfile(cf.palette_path, path)
+    csv_seconds = min(timeit.repeat(lambda: cf.load_palette(path), number=20, repeat=5))
+    expected = cf.load_palette(path)
+    cf.compile_palette(path)
+    assert list(cf.load_palette(path).items()) == list(expected.items())
+    compiled_seconds = min(timeit.repeat(lambda: cf.load_palette(path), number=20, repeat=5))
+    assert compiled_seconds < csv_seconds
@@ -0,0 +1,92 @@
+# tests for image_palette
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+# usage: python -m pytest -q
+#
+# palettes of seeded pixels must not depend on how the pixels are chunked
+# or where they are read from.
+
+import io
+
+import numpy as np
+
+import color_functions as cf
+import image_palette as ip
+
+
+def _pixels(n=50000, seed=20240101):
+    rng = np.random.default_rng(seed)
+    base = np.array([[200, 30, 30], [20, 180, 40], [30, 40, 210], [240, 240, 240]])
+    noise = rng.integers(-8, 9, (n, 3))
+    return np.clip(base[rng.integers(0, 4, n)] + noise, 0, 255).astype(np.uint8)
+
+
+def test_chunked_sources_match():
+    pixels = _pixels()
+    expected, extractor = ip.extract_palette(pixels.tobytes(), k=4)
+    assert extractor.pixels == len(pixels)
+    assert sum(count for hexval, name, count in expected) == len(pixels)
+    assert [name for hexval, name, count in expected] == cf.get_color_names([h for h, n, c in expected])
+    for chunk in (333, 4097):
+        assert ip.extract_palette(pixels.tobytes(), k=4, chunk_pixels=chunk)[0] == expected
+        assert ip.extract_palette(io.BytesIO(pixels.tobytes()), k=4, chunk_pixels=chunk)[0] == expected
+    assert ip.extract_palette(pixels, k=4)[0] == expected
+
+
+def test_file_source(tmp_path):
+    pixels = _pixels(10000)
+    path = tmp_path / 'pixels.raw'
+    path.write_bytes(b'HEAD' + pixels.tobytes() + b'\x01')
+    expected = ip.extract_palette(pixels.tobytes(), k=3)[0]
+    assert ip.extract_palette(str(path), k=3, offset=4, chunk_pixels=777)[0] == expected
+
+
+def test_rgba_skips_transparent_pixels():
+    pixels = _pixels(20000)
+    alpha = np.where(np.arange(len(pixels)) % 3 == 0, 0, 255).astype(np.uint8)
+    rgba = np.hstack([pixels, alpha[:, None]])
+    palette, extractor = ip.extract_palette(rgba.tobytes(), k=4, channels=4, chunk_pixels=3000)
+    assert extractor.pixels == (alpha > 0).sum()
+    assert palette == ip.extract_palette(pixels[alpha > 0].tobytes(), k=4)[0]
+
+
+def test_empty_input(tmp_path):
+    path = tmp_path / 'empty.raw'
+    path.write_bytes(b'')
+    for source in (b'', str(path), io.BytesIO(b''), b'\x01\x02'):
+        palette, extractor = ip.extract_palette(source)
+        assert palette == []
+        assert extractor.pixels == 0
+        assert extractor.name_histogram() == {}
+
+
+def test_name_histogram():
+    pixels = _pixels(10000)
+    extractor = ip.extract_palette(pixels.tobytes())[1]
+    histogram = extractor.name_histogram()
+    assert sum(histogram.values()) == len(pixels)
+    assert list(histogram.values()) == sorted(histogram.values(), reverse=True)
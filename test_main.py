@@ -0,0 +1,88 @@
+# tests for main
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+# usage: python -m pytest -q
+#
+# the command line is run on small files with tiny blocks, so rows are
+# spread over several blocks and workers and must come back in input order.
+
+import csv
+import json
+
+import numpy as np
+import pytest
+
+import color_functions as cf
+import main
+
+
+def _hexes(n, seed=20240101):
+    rng = np.random.default_rng(seed)
+    return cf.rgb2hex_array(rng.integers(0, 256, (n, 3), dtype=np.uint8))
+
+
+def _run(tmp_path, data, command, *args):
+    source = tmp_path / 'input'
+    source.write_bytes(data)
+    target = tmp_path / 'output'
+    assert main.main([command, str(source)] + list(args) + ['-o', str(target), '--progress', '0']) == 0
+    return target.read_text().split('\n')[:-1]
+
+
+@pytest.mark.parametrize('workers', ['0', '2'])
+def test_name_order(tmp_path, workers):
+    hexes = _hexes(500)
+    data = ''.join(h + '\n' for h in hexes).encode()
+    lines = _run(tmp_path, data, 'name', '--workers', workers, '--block-size', '64')
+    assert lines == ['%s,%s' % row for row in zip(hexes, cf.get_color_names(hexes))]
+
+
+def test_invalid_and_blank_rows(tmp_path, capsys):
+    data = b'#ff0000\n\nnot a color\n#ff0000\x0c#00ff00\r\n#0000ff'
+    lines = _run(tmp_path, data, 'name', '--format', 'lines', '--workers', '0')
+    assert lines == ['#ff0000,' + cf.getColorName('#ff0000'), '""', 'not a color',
+                     '#ff0000\x0c#00ff00', '#0000ff,' + cf.getColorName('#0000ff')]
+    assert capsys.readouterr().err.startswith('5 rows, 3 invalid')
+
+
+def test_csv_and_jsonl_rows(tmp_path):
+    data = b'#ff0000,a\n\n"#00\nff00",b\n#00f,c\r\n#0\r0f,d\n'
+    lines = _run(tmp_path, data, 'name', '--format', 'csv', '--workers', '0')
+    assert [row[0] for row in csv.reader(lines)] == ['#ff0000', '', '#00', 'ff00"', '#00f', '']
+    data = b'{"hex": "#ff0000"}\n[1]\n{"color": "#00ff00"}\n{"hex": "#0000ff"}\n'
+    rows = [json.loads(line) for line in _run(tmp_path, data, 'name', '--format', 'jsonl',
+                                              '--output', 'jsonl', '--workers', '0')]
+    assert [row['name'] is None for row in rows] == [False, True, True, False]
+    assert [row['hex'] for row in rows] == ['#ff0000', '', '', '#0000ff']
+
+
+def test_harmony_rows(tmp_path):
+    hexes = _hexes(20)
+    data = ''.join(h + '\n' for h in hexes).encode() + b'xyz\n'
+    lines = _run(tmp_path, data, 'analogous', '--angle', '45', '--workers', '0')
+    expected = [','.join([h] + [cf.rgb2hex(tuple(c)) for c in cf.analogous(h, 45)]) for h in hexes]
+    assert lines == expected + ['xyz']
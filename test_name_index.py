@@ -0,0 +1,84 @@
+# tests for name_index
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+# usage: python -m pytest -q
+#
+# fuzzy search of short queries, which is complete rather than shortlisted
+# by trigrams, is checked against edit distances to every name of a seeded
+# random catalog.
+
+import random
+import string
+
+import name_index as ni
+
+_palette = {'#ffb7c5': 'Cherry Blossom', '#a8c3bc': 'Opal', '#f4c2c2': 'Tea Rose',
+            '#f883c2': 'Tea rose', '#0048ba': 'Absolute Zero', '#f0f8ff': 'Alice Blue',
+            '#5d8aa8': 'Air Force Blue', '#d3d3d3': 'Light Gray', '#c0c0c0': 'light  gray'}
+
+
+def test_duplicate_names():
+    index = ni.NameIndex(_palette)
+    assert index.exact('tea rose') == ['#f4c2c2', '#f883c2']
+    assert index.exact('LIGHT GRAY') == ['#d3d3d3', '#c0c0c0']
+    assert index.exact('opal') == ['#a8c3bc']
+    assert index.exact('mauve') == []
+
+
+def test_prefix():
+    index = ni.NameIndex(_palette)
+    assert index.prefix('a') == ['absolute zero', 'air force blue', 'alice blue']
+    assert index.prefix('blue') == ['air force blue', 'alice blue']
+    assert index.prefix('a', limit=2) == ['absolute zero', 'air force blue']
+    assert index.prefix('zz') == []
+
+
+def test_fuzzy():
+    index = ni.NameIndex(_palette)
+    assert index.fuzzy('poal') == [('opal', 1)]
+    assert index.fuzzy('chery blosom') == [('cherry blossom', 2)]
+    assert index.fuzzy('tea rsoe') == [('tea rose', 1)]
+    assert index.fuzzy('xyzw') == []
+
+
+def test_fuzzy_matches_scan():
+    rng = random.Random(20240101)
+    names = [''.join(rng.choice('abcdef') for _ in range(rng.randint(1, 10))) for _ in range(2000)]
+    index = ni.NameIndex({'#%06x' % i: name for i, name in enumerate(names)})
+    queries = ['', 'abc', 'fade', 'bead', 'ace'] + [name for name in rng.sample(names, 60) if len(name) <= 5]
+    for text in queries:
+        for max_distance in (1, 2, 3):
+            expected = {name for name in index.names if ni.edit_distance(text, name) <= max_distance}
+            found = index.fuzzy(text, limit=len(names), max_distance=max_distance)
+            assert {name for name, distance in found} == expected
+
+
+def test_edit_distance():
+    assert ni.edit_distance('opal', 'poal') == 1
+    assert ni.edit_distance('kitten', 'sitting') == 3
+    assert ni.edit_distance('kitten', 'sitting', max_distance=1) == 2
+    assert ni.edit_distance('', 'abc', max_distance=5) == 3
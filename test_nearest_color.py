@@ -0,0 +1,140 @@
+# tests for nearest_color
+# written using Python 3
+
+# The MIT License (MIT)
+#
+# Copyright (c) Lumos AI LLC
+#
+# Permission is hereby granted, free of charge, to any person obtaining
+# a copy of this software and associated documentation files (the
+# "Software"), to deal in the Software without restriction, including
+# without limitation the rights to use, copy, modify, merge, publish,
+# distribute, sublicense, and/or sell copies of the Software, and to
+# permit persons to whom the Software is furnished to do so, subject to
+# the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT.
+# IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY
+# CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION OF CONTRACT,
+# TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
+# SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
+
+
+# usage: python -m pytest -q
+#
+# searches through the index are checked against a scan of every palette
+# color, and delta_e_2000 against reference pairs from Sharma, Wu and
+# Dalal, "The CIEDE2000 color-difference formula" (2005).
+
+import numpy as np
+import pytest
+
+import color_functions as cf
+import nearest_color as nc
+
+
+def _rgb(n, seed):
+    return np.random.default_rng(seed).integers(0, 256, (n, 3), dtype=np.uint8)
+
+
+def _palette(n=500, seed=20240101):
+    return {c: 'color %d' % i for i, c in enumerate(cf.rgb2hex_array(_rgb(n, seed)))}
+
+
+@pytest.fixture(params=['scipy', 'numpy'])
+def index(request, monkeypatch):
+    # the numpy KD-tree is what runs when scipy is not installed
+    if request.param == 'numpy':
+        monkeypatch.setattr(nc, 'cKDTree', None)
+    elif nc.cKDTree is None:
+        pytest.skip('scipy is not installed')
+
+
+@pytest.mark.parametrize('metric', ['euclidean', 'cie76', 'pearson'])
+def test_query_matches_scan(index, metric):
+    palette = _palette()
+    rgb = _rgb(2000, 1)
+    search = nc.NearestColor(palette, metric)
+    scan = nc.NearestColor(palette, metric, candidates=None)
+    distances, indices = search.query(rgb, k=3)
+    expected, expected_indices = scan.query(rgb, k=3)
+    assert np.allclose(distances, expected)
+    assert (indices[:, 0] == expected_indices[:, 0]).all()
+
+
+def test_euclidean_distances(index):
+    palette = _palette()
+    rgb = _rgb(1000, 2)
+    distances, indices = nc.NearestColor(palette).query(rgb, k=5)
+    points = cf.hex2rgb_array(list(palette)).astype(np.float64)
+    full = np.sqrt(((rgb[:, None, :].astype(np.float64) - points) ** 2).sum(axis=2))
+    assert np.allclose(distances, np.sort(full, axis=1)[:, :5])
+    assert np.allclose(np.take_along_axis(full, indices, axis=1), distances)
+
+
+def test_pearson_matches_get_color_names(index):
+    rgb = np.vstack([_rgb(1000, 3), np.repeat(np.arange(0, 256, 15, dtype=np.uint8)[:, None], 3, axis=1)])
+    assert nc.NearestColor(metric='pearson').get_color_names(rgb) == cf.get_color_names(rgb)
+
+
+def test_kd_index_matches_scan():
+    rng = np.random.default_rng(4)
+    for n in (1, 50, 3000):
+        points = rng.random((n, 3)) * 100
+        x = rng.random((500, 3)) * 100
+        distances, indices = nc._KDIndex(points).query(x, k=10)
+        full = ((x[:, None, :] - points) ** 2).sum(axis=2)
+        assert np.allclose(distances ** 2, np.sort(full, axis=1)[:, :min(n, 10)])
+
+
+_sharma = [
+    ((50.0, 2.6772, -79.7751), (50.0, 0.0, -82.7485), 2.0425),
+    ((50.0, 3.1571, -77.2803), (50.0, 0.0, -82.7485), 2.8615),
+    ((50.0, 2.8361, -74.0200), (50.0, 0.0, -82.7485), 3.4412),
+    ((50.0, 0.0, 0.0), (50.0, -1.0, 2.0), 2.3669),
+    ((50.0, 2.4900, -0.0010), (50.0, -2.4900, 0.0009), 7.1792),
+    ((50.0, 2.5, 0.0), (73.0, 25.0, -18.0), 27.1492),
+    ((50.0, 2.5, 0.0), (61.0, -5.0, 29.0), 22.8977),
+    ((50.0, 2.5, 0.0), (56.0, -27.0, -3.0), 31.9030),
+    ((50.0, 2.5, 0.0), (58.0, 24.0, 15.0), 19.4535),
+    ((60.2574, -34.0099, 36.2677), (60.4626, -34.1751, 39.4387), 1.2644),
+    ((63.0109, -31.0961, -5.8663), (62.8187, -29.7946, -4.0864), 1.2630),
+    ((22.7233, 20.0904, -46.6940), (23.0331, 14.9730, -42.5619), 2.0373),
+]
+
+
+def test_delta_e_2000_reference():
+    lab1 = np.array([a for a, b, d in _sharma])
+    lab2 = np.array([b for a, b, d in _sharma])
+    expected = np.array([d for a, b, d in _sharma])
+    assert np.allclose(nc.delta_e_2000(lab1, lab2), expected, atol=1e-4)
+    assert np.allclose(nc.delta_e_2000(lab2, lab1), expected, atol=1e-4)
+
+
+def test_ciede2000_full_scan():
+    palette = _palette(300)
+    rgb = _rgb(500, 5)
+    names = nc.NearestColor(palette, 'ciede2000', candidates=None).get_color_names(rgb)
+    lab = nc.rgb2lab(cf.hex2rgb_array(list(palette)))
+    best = nc.delta_e_2000(nc.rgb2lab(rgb)[:, None, :], lab).argmin(axis=1)
+    assert names == [list(palette.values())[i] for i in best]
+
+
+def test_pearson_gray_palette(index):
+    # pearson keeps grays out of the index, which leaves it empty here
+    palette = {'#000000': 'black', '#808080': 'gray', '#ffffff': 'white'}
+    rgb = np.vstack([_rgb(200, 6), [[0, 0, 0], [90, 90, 90]]]).astype(np.uint8)
+    cf.set_palette(palette)
+    try:
+        expected = [cf.getColorName(c) for c in cf.rgb2hex_array(rgb)]
+    finally:
+        cf.set_palette(cf.load_palette())
+    search = nc.NearestColor(palette, 'pearson')
+    assert search.get_color_names(rgb) == expected
+    distances, indices = search.query(rgb, k=3)
+    assert indices.shape == (len(rgb), 3)